@@ -10,8 +10,7 @@ from core.system_config import sys_config
 from core.orchestrator import Orchestrator
 from core.data_parser.data_processor import (
     inject_net_weight_pricing, 
-    aggregate_standard_by_po_item_price, 
-    aggregate_custom_by_po_item,
+    aggregate_standard_and_custom,
     format_aggregation_as_list,
     aggregate_per_po_with_pallets,
     calculate_footer_totals
@@ -118,8 +117,7 @@ def generate_invoice(request: GenerateRequest):
             
             std_map = {}
             cust_map = {}
-            aggregate_standard_by_po_item_price(merged_data, std_map)
-            aggregate_custom_by_po_item(merged_data, cust_map)
+            aggregate_standard_and_custom(merged_data, std_map, cust_map)
             
             single = full_data.get("single_table", {})
             single["aggregation"] = format_aggregation_as_list(std_map, mode='standard')
@@ -18,6 +18,23 @@ from pydantic import BaseModel
 class HistoryRequest(BaseModel):
     filename: str
 
+def _to_float(val) -> float:
+    """Registry cell -> float. ',' and '$' are ignored; missing, blank or unparseable values give 0.0."""
+    val_type = type(val)
+    if val_type is float: return val
+    if val is None: return 0.0
+    try:
+        if val_type is str:
+            val = val.replace(',', '').replace('$', '').strip()
+            return float(val) if val else 0.0
+        return float(val) if str(val).strip() != "" else 0.0
+    except (ValueError, TypeError, OverflowError): return 0.0
+
+def _adjustment_to_float(val) -> float:
+    """Price adjustment amount -> float. Plain float() parse: '1,000' or '$5' give 0.0, like blanks."""
+    try: return float(val) if val is not None and str(val).strip() != "" else 0.0
+    except (ValueError, TypeError, OverflowError): return 0.0
+
 @router.get("/history")
 async def get_history():
     """Retrieve list of past runs."""
@@ -129,29 +146,23 @@ async def accept_invoice(req: HistoryRequest, db: Session = Depends(get_db)):
         total_amount = 0.0
         total_pallets = 0.0
         
-        def to_float(val):
-            try:
-                if isinstance(val, str): val = val.replace(',', '').replace('$', '').strip()
-                return float(val) if val is not None and str(val).strip() != "" else 0.0
-            except: return 0.0
-
         footer_data = data.get("footer_data")
         if not footer_data or "grand_total" not in footer_data:
             return JSONResponse(status_code=422, content={"error": f"Cannot accept: missing footer_data or grand_total in '{req.filename}'"})
 
         grand_total = footer_data["grand_total"]
-        total_pallets = to_float(grand_total.get("col_pallet_count", 0))
-        total_sqft = to_float(grand_total.get("col_qty_sf", 0))
-        total_net = to_float(grand_total.get("col_net", 0))
-        total_amount = to_float(grand_total.get("col_amount", 0))
+        total_pallets = _to_float(grand_total.get("col_pallet_count", 0))
+        total_sqft = _to_float(grand_total.get("col_qty_sf", 0))
+        total_net = _to_float(grand_total.get("col_net", 0))
+        total_amount = _to_float(grand_total.get("col_amount", 0))
         
         # Prioritize multi_table so parsed values (like pallets and CBM) are accurately tracked
         source_tables = data.get("multi_table") or data.get("raw_data") or []
         for table in source_tables:
             if isinstance(table, list):
                 for row in table:
-                    sqft_val = to_float(row.get("col_qty_sf"))
-                    amount_val = to_float(row.get("col_amount"))
+                    sqft_val = _to_float(row.get("col_qty_sf"))
+                    amount_val = _to_float(row.get("col_amount"))
                     item_count += 1
 
                     item = InvoiceItem(
@@ -167,14 +178,14 @@ async def accept_invoice(req: HistoryRequest, db: Session = Depends(get_db)):
                         col_desc=str(row.get("col_desc", "")),
                         col_level=str(row.get("col_level", "")),
                         col_grade=str(row.get("col_grade", "")),
-                        col_qty_pcs=to_float(row.get("col_qty_pcs")),
+                        col_qty_pcs=_to_float(row.get("col_qty_pcs")),
                         col_qty_sf=sqft_val,
-                        col_pallet_count=to_float(row.get("col_pallet_count")),
-                        col_net=to_float(row.get("col_net")),
-                        col_gross=to_float(row.get("col_gross")),
+                        col_pallet_count=_to_float(row.get("col_pallet_count")),
+                        col_net=_to_float(row.get("col_net")),
+                        col_gross=_to_float(row.get("col_gross")),
                         col_cbm_raw=str(row.get("col_cbm_raw", row.get("col_cbm", ""))),
                         col_hs_code=str(row.get("col_hs_code", "")),
-                        col_unit_price=to_float(row.get("col_unit_price")),
+                        col_unit_price=_to_float(row.get("col_unit_price")),
                         col_amount=amount_val,
                         is_adjustment=0,
                         timestamp=get_cambodia_time()
@@ -183,10 +194,7 @@ async def accept_invoice(req: HistoryRequest, db: Session = Depends(get_db)):
 
         if "price_adjustment" in data:
             for adj in data["price_adjustment"]:
-                def to_float(val):
-                    try: return float(val) if val is not None and str(val).strip() != "" else 0.0
-                    except: return 0.0
-                amt = to_float(adj.get("amount", 0.0))
+                amt = _adjustment_to_float(adj.get("amount", 0.0))
                 total_amount += amt
                 item = InvoiceItem(
                     invoice_id=req.filename,
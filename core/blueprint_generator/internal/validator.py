@@ -3,6 +3,27 @@ from typing import Dict, Any, List
 
 logger = logging.getLogger(__name__)
 
+# Error message templates, formatted only when an error is actually recorded
+_MISSING_TOP = "Missing Top-Level Section: '{}'"
+_ERR_TOP_DETAIL = "The '{}' section is a fundamental part of the Master Config structure."
+_ERR_TOP_FIX = "Ensure the generator creates a '{}' dictionary at the root of the JSON."
+
+_MISSING_META = "Missing Meta Field: '_meta.{}'"
+_ERR_META_DETAIL = "Metadata is crucial for version control and file identification."
+_ERR_META_FIX = "Add '{}' to the '_meta' section."
+
+_MISSING_STYLING = "Missing Styling for Sheet: '{}'"
+_ERR_STYLING_DETAIL = "Every sheet listed in 'processing' needs a matching entry in 'styling_bundle'."
+_ERR_STYLING_FIX = "Add '{}' to 'styling_bundle' with its column/row styles."
+
+_MISSING_LAYOUT = "Missing Layout for Sheet: '{}'"
+_ERR_LAYOUT_DETAIL = "Every sheet listed in 'processing' needs a matching entry in 'layout_bundle'."
+_ERR_LAYOUT_FIX = "Add '{}' to 'layout_bundle' with its sections."
+
+_MISSING_SECTIONS = "Missing Sections Definition in '{}' Layout"
+_ERR_SECTIONS_DETAIL = "Layout needs explicit '_sections' list defining order."
+_ERR_SECTIONS_FIX = "Add '_sections': ['structure', 'data_flow', ...] to layout."
+
 class ConfigValidator:
     """
     Validates a generated Invoice Configuration against the 'Ideal Master Config' structure.
@@ -23,9 +44,9 @@ class ConfigValidator:
         for key in self.REQUIRED_TOP_LEVEL_KEYS:
             if key not in config:
                 errors.append({
-                    "issue": f"Missing Top-Level Section: '{key}'",
-                    "detail": f"The '{key}' section is a fundamental part of the Master Config structure.",
-                    "fix": f"Ensure the generator creates a '{key}' dictionary at the root of the JSON."
+                    "issue": _MISSING_TOP.format(key),
+                    "detail": _ERR_TOP_DETAIL.format(key),
+                    "fix": _ERR_TOP_FIX.format(key)
                 })
         
         # 2. Meta Data
@@ -33,9 +54,9 @@ class ConfigValidator:
         for key in self.REQUIRED_META_KEYS:
             if key not in meta:
                  errors.append({
-                     "issue": f"Missing Meta Field: '_meta.{key}'",
-                     "detail": "Metadata is crucial for version control and file identification.",
-                     "fix": f"Add '{key}' to the '_meta' section."
+                     "issue": _MISSING_META.format(key),
+                     "detail": _ERR_META_DETAIL,
+                     "fix": _ERR_META_FIX.format(key)
                  })
 
         # 3. Processing
@@ -47,45 +68,40 @@ class ConfigValidator:
                  "fix": "Add 'sheets' list to 'processing'."
              })
         
-        # 4. Styling Bundle (Deep Check)
-        if "styling_bundle" in config:
-            sb = config.get("styling_bundle", {})
-            if "defaults" not in sb:
-                errors.append({
-                    "issue": "Missing Section: 'styling_bundle.defaults'",
-                    "detail": "Global default styles are required.",
-                    "fix": "Add 'defaults' to 'styling_bundle'."
-                })
-            
-            # Check for per-sheet styling
-            for sheet in processing.get("sheets", []):
-                if sheet not in sb:
-                     errors.append({
-                         "issue": f"Missing Styling for Sheet: '{sheet}'",
-                         "detail": f"Every sheet listed in 'processing' needs a matching entry in 'styling_bundle'.",
-                         "fix": f"Add '{sheet}' to 'styling_bundle' with its column/row styles."
-                     })
+        # 4. Styling Bundle defaults
+        check_styling = "styling_bundle" in config
+        check_layout = "layout_bundle" in config
+        sb = config.get("styling_bundle", {})
+        lb = config.get("layout_bundle", {})
+        if check_styling and "defaults" not in sb:
+            errors.append({
+                "issue": "Missing Section: 'styling_bundle.defaults'",
+                "detail": "Global default styles are required.",
+                "fix": "Add 'defaults' to 'styling_bundle'."
+            })
 
-        # 5. Layout Bundle (Deep Check)
-        if "layout_bundle" in config:
-            lb = config.get("layout_bundle", {})
-            
-            # Check for per-sheet layout
+        # 5. Per-sheet styling and layout (Deep Check), one pass over the sheet list
+        if check_styling or check_layout:
             for sheet in processing.get("sheets", []):
-                if sheet not in lb:
+                if check_styling and sheet not in sb:
                      errors.append({
-                         "issue": f"Missing Layout for Sheet: '{sheet}'",
-                         "detail": f"Every sheet listed in 'processing' needs a matching entry in 'layout_bundle'.",
-                         "fix": f"Add '{sheet}' to 'layout_bundle' with its sections."
+                         "issue": _MISSING_STYLING.format(sheet),
+                         "detail": _ERR_STYLING_DETAIL,
+                         "fix": _ERR_STYLING_FIX.format(sheet)
                      })
-                else:
-                    # Deep check sheet layout structure
-                    sl = lb[sheet]
-                    if "_sections" not in sl:
+                if check_layout:
+                    if sheet not in lb:
+                         errors.append({
+                             "issue": _MISSING_LAYOUT.format(sheet),
+                             "detail": _ERR_LAYOUT_DETAIL,
+                             "fix": _ERR_LAYOUT_FIX.format(sheet)
+                         })
+                    elif "_sections" not in lb[sheet]:
+                        # Deep check sheet layout structure
                         errors.append({
-                            "issue": f"Missing Sections Definition in '{sheet}' Layout",
-                            "detail": "Layout needs explicit '_sections' list defining order.",
-                            "fix": "Add '_sections': ['structure', 'data_flow', ...] to layout."
+                            "issue": _MISSING_SECTIONS.format(sheet),
+                            "detail": _ERR_SECTIONS_DETAIL,
+                            "fix": _ERR_SECTIONS_FIX
                         })
 
         return errors
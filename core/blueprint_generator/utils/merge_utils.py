@@ -1,5 +1,7 @@
 import openpyxl
 import traceback
+import numpy as np
+from collections.abc import Hashable
 from openpyxl.worksheet.worksheet import Worksheet
 from openpyxl.styles import Alignment
 from openpyxl.utils import range_boundaries, get_column_letter
@@ -15,8 +17,9 @@ def store_original_merges(workbook: openpyxl.Workbook, sheet_names: List[str]) -
     Merges starting above row 16 (row < 16) are ignored.
     """
     original_merges = {}
+    known_sheets = set(workbook.sheetnames)
     for sheet_name in sheet_names:
-        if sheet_name in workbook.sheetnames:
+        if sheet_name in known_sheets:
             worksheet: Worksheet = workbook[sheet_name]
             merges_data = []
             merged_ranges_copy = list(worksheet.merged_cells.ranges)
@@ -59,63 +62,68 @@ def find_and_restore_merges_heuristic(workbook: openpyxl.Workbook,
     except Exception:
         return
 
+    known_sheets = set(workbook.sheetnames)
     for sheet_name in processed_sheet_names:
-        if sheet_name in workbook.sheetnames and sheet_name in stored_merges:
+        if sheet_name in known_sheets and sheet_name in stored_merges:
             worksheet: Worksheet = workbook[sheet_name]
             original_merges_data = stored_merges[sheet_name]
+            work = [m for m in original_merges_data if m[0] > 1 and m[1] is not None]
+            if not work:
+                continue
+
+            # One bottom-up scan of the search window, recording where each wanted value appears (in scan order)
+            wanted_values = {v for _, v, _ in work if isinstance(v, Hashable)}
+            locations = {}
+            for r in range(search_max_row, search_min_row - 1, -1):
+                for c in range(search_min_col, search_max_col + 1):
+                    current_val = worksheet.cell(row=r, column=c).value
+                    if current_val in wanted_values:
+                        locations.setdefault(current_val, []).append((r, c))
+
             successfully_restored_values_on_sheet = set()
             
-            for merge_idx, (col_span, stored_value, stored_height) in enumerate(original_merges_data):
-                if col_span <= 1:
-                    continue
-
+            for col_span, stored_value, stored_height in work:
                 if stored_value in successfully_restored_values_on_sheet:
                     continue
 
-                found = False
-                for r in range(search_max_row, search_min_row - 1, -1):
-                    for c in range(search_min_col, search_max_col + 1):
-                        current_cell = worksheet.cell(row=r, column=c)
-                        current_val = current_cell.value
-
-                        if current_val == stored_value:
-                            start_row, start_col = r, c
-                            end_row = start_row
-                            end_col = start_col + col_span - 1
-
-                            merged_ranges_copy = list(worksheet.merged_cells.ranges)
-                            for existing_merge in merged_ranges_copy:
-                                rows_overlap = (existing_merge.min_row <= end_row) and (existing_merge.max_row >= start_row)
-                                cols_overlap = (existing_merge.min_col <= end_col) and (existing_merge.max_col >= start_col)
+                location = None
+                for r, c in locations.get(stored_value, ()) if isinstance(stored_value, Hashable) else ():
+                    # A merge restored earlier in this pass may have cleared the cell
+                    if worksheet.cell(row=r, column=c).value == stored_value:
+                        location = (r, c)
+                        break
+                if location is None:
+                    continue
 
-                                if rows_overlap and cols_overlap:
-                                    try:
-                                        worksheet.unmerge_cells(str(existing_merge))
-                                    except Exception:
-                                        pass
+                start_row, start_col = location
+                end_row = start_row
+                end_col = start_col + col_span - 1
 
-                            try:
-                                worksheet.merge_cells(start_row=start_row, start_column=start_col, end_row=end_row, end_column=end_col)
+                merged_ranges_copy = list(worksheet.merged_cells.ranges)
+                for existing_merge in merged_ranges_copy:
+                    rows_overlap = (existing_merge.min_row <= end_row) and (existing_merge.max_row >= start_row)
+                    cols_overlap = (existing_merge.min_col <= end_col) and (existing_merge.max_col >= start_col)
 
-                                if stored_height is not None:
-                                    try:
-                                        worksheet.row_dimensions[start_row].height = stored_height
-                                    except Exception:
-                                        pass
+                    if rows_overlap and cols_overlap:
+                        try:
+                            worksheet.unmerge_cells(existing_merge.coord)
+                        except Exception:
+                            pass
 
-                                top_left_cell_to_set = worksheet.cell(row=start_row, column=start_col)
-                                top_left_cell_to_set.value = stored_value
+                try:
+                    worksheet.merge_cells(start_row=start_row, start_column=start_col, end_row=end_row, end_column=end_col)
 
-                                successfully_restored_values_on_sheet.add(stored_value)
-                                found = True
-                                break
+                    if stored_height is not None:
+                        try:
+                            worksheet.row_dimensions[start_row].height = stored_height
+                        except Exception:
+                            pass
 
-                            except Exception:
-                                found = True
-                                break
+                    worksheet.cell(row=start_row, column=start_col).value = stored_value
 
-                    if found:
-                        break
+                    successfully_restored_values_on_sheet.add(stored_value)
+                except Exception:
+                    pass
 
 def force_unmerge_from_row_down(worksheet: Worksheet, start_row: int):
     """
@@ -126,51 +134,80 @@ def force_unmerge_from_row_down(worksheet: Worksheet, start_row: int):
     for merged_range in all_merged_ranges:
         if merged_range.min_row >= start_row:
             try:
-                worksheet.unmerge_cells(str(merged_range))
+                worksheet.unmerge_cells(merged_range.coord)
             except Exception:
                 pass
 
+_OP_DELETE = 0
+_OP_INSERT = 1
+
 class MergeOffsetTracker:
     """
     Tracks row operations to calculate position offsets for empty merge restoration.
+    Operations are bucketed per sheet and stored column-wise (kind/position/count arrays).
     """
     
     def __init__(self):
-        self.operations = []  # List of (operation_type, position, count, sheet_name)
+        self._pending: Dict[str, Tuple[List[int], List[int], List[int]]] = {}  # sheet -> (kinds, positions, counts)
+        self._by_sheet: Dict[str, Dict[str, np.ndarray]] = {}
+        self._dirty = False
+    
+    def _log(self, op_kind: int, position: int, count: int, sheet_name: str):
+        kinds, positions, counts = self._pending.setdefault(sheet_name, ([], [], []))
+        kinds.append(op_kind)
+        positions.append(position)
+        counts.append(count)
+        self._dirty = True
     
     def log_delete_rows(self, start_row: int, count: int, sheet_name: str):
         """Log a row deletion operation."""
-        self.operations.append(('delete', start_row, count, sheet_name))
+        self._log(_OP_DELETE, start_row, count, sheet_name)
     
     def log_insert_rows(self, position: int, count: int, sheet_name: str):
         """Log a row insertion operation."""
-        self.operations.append(('insert', position, count, sheet_name))
+        self._log(_OP_INSERT, position, count, sheet_name)
     
-    def calculate_new_position(self, original_row: int, sheet_name: str) -> int:
-        """Calculate the new position of a row after all operations."""
-        current_row = original_row
+    def finalize(self):
+        """Convert the logged operations into per-sheet NumPy arrays."""
+        self._by_sheet = {
+            sheet_name: {
+                'kind': np.array(kinds, dtype=np.int8),
+                'position': np.array(positions, dtype=np.int32),
+                'count': np.array(counts, dtype=np.int32),
+            }
+            for sheet_name, (kinds, positions, counts) in self._pending.items()
+        }
+        self._dirty = False
+    
+    def calculate_new_positions(self, original_rows: List[int], sheet_name: str) -> np.ndarray:
+        """
+        Calculate the new positions of many rows after all operations.
+        Rows that fall inside a deleted block are returned as -1.
+        """
+        if self._dirty:
+            self.finalize()
         
-        for op_type, position, count, op_sheet in self.operations:
-            if op_sheet != sheet_name:
-                continue
-            
-            if op_type == 'delete':
-                delete_start = position
+        rows = np.array(original_rows, dtype=np.int64)
+        ops = self._by_sheet.get(sheet_name)
+        if ops is None or rows.size == 0:
+            return rows
+        
+        alive = np.ones(rows.shape, dtype=bool)
+        for op_kind, position, count in zip(ops['kind'].tolist(), ops['position'].tolist(), ops['count'].tolist()):
+            if op_kind == _OP_DELETE:
                 delete_end = position + count - 1
-                
-                if current_row < delete_start:
-                    pass
-                elif current_row <= delete_end:
-                    current_row = -1
-                    break
-                else:
-                    current_row -= count
-            
-            elif op_type == 'insert':
-                if current_row >= position:
-                    current_row += count
+                deleted = alive & (rows >= position) & (rows <= delete_end)
+                rows[alive & (rows > delete_end)] -= count
+                alive &= ~deleted
+            else:
+                rows[alive & (rows >= position)] += count
         
-        return current_row
+        rows[~alive] = -1
+        return rows
+    
+    def calculate_new_position(self, original_row: int, sheet_name: str) -> int:
+        """Calculate the new position of a row after all operations."""
+        return int(self.calculate_new_positions([original_row], sheet_name)[0])
 
 
 def store_empty_merges_with_coordinates(workbook: openpyxl.Workbook, sheet_names: List[str]) -> Dict[str, List[Dict[str, Any]]]:
@@ -178,10 +215,15 @@ def store_empty_merges_with_coordinates(workbook: openpyxl.Workbook, sheet_names
     Store empty merges (merges with no value) along with their coordinates for offset-based restoration.
     """
     empty_merges = {}
+    known_sheets = set(workbook.sheetnames)
     
     for sheet_name in sheet_names:
-        if sheet_name in workbook.sheetnames:
+        if sheet_name in known_sheets:
             worksheet = workbook[sheet_name]
+            if not worksheet.merged_cells.ranges:
+                empty_merges[sheet_name] = []
+                continue
+            
             sheet_empty_merges = []
             merged_ranges_copy = list(worksheet.merged_cells.ranges)
             
@@ -237,15 +279,15 @@ def restore_empty_merges_with_offset(workbook: openpyxl.Workbook,
         
         worksheet = workbook[sheet_name]
         sheet_merges = empty_merges[sheet_name]
+        new_rows = offset_tracker.calculate_new_positions(
+            [merge_data['original_row'] for merge_data in sheet_merges], sheet_name
+        ).tolist()
         
-        for merge_data in sheet_merges:
-            original_row = merge_data['original_row']
+        for merge_data, new_row in zip(sheet_merges, new_rows):
             col = merge_data['col']
             span = merge_data['span']
             height = merge_data['height']
             
-            new_row = offset_tracker.calculate_new_position(original_row, sheet_name)
-            
             if new_row <= 0:
                 continue
             
@@ -3,7 +3,11 @@ import logging
 from typing import Dict, List, Any, Optional, Tuple
 import decimal # Use Decimal for precise calculations
 import re
+import sys
+from itertools import repeat
+from operator import itemgetter
 import pprint
+import numpy as np
 # Import config values (consider passing as arguments)
 from .config import DISTRIBUTION_BASIS_COLUMN # Keep this
 
@@ -13,17 +17,57 @@ decimal.getcontext().prec = 28 # Default precision, adjust if needed
 CBM_DECIMAL_PLACES = decimal.Decimal('0.0001')
 # Define default precision for other distributions (e.g., 4 decimal places)
 DEFAULT_DIST_PRECISION = decimal.Decimal('0.0001')
+# Shared constants for the distribution and aggregation code (Decimals are immutable, so reuse is safe)
+_DEC_ZERO = decimal.Decimal(0)
+_TOLERANCE_CBM = CBM_DECIMAL_PLACES / decimal.Decimal(2)
+_TOLERANCE_DEF = DEFAULT_DIST_PRECISION / decimal.Decimal(2)
+# Context for the distribution and aggregation arithmetic, independent of whatever context
+# the caller's thread has
+_DECIMAL_CONTEXT = decimal.Context(prec=28)
+# Legacy short column names accepted by distribute_values; anything else maps to f"col_{name}"
+_LEGACY_TO_CANON = {
+    'net': 'col_net',
+    'gross': 'col_gross',
+    'cbm': 'col_cbm',
+    'sqft': 'col_qty_sf',
+    'pcs': 'col_qty_pcs',
+    'amount': 'col_amount',
+    'pallet_count': 'col_pallet_count',
+}
+# Folds 'X' into 'x' so "LxWxH" / "LXWXH" CBM strings split with one str.split
+_CBM_X_TRANSLATE = str.maketrans('X', 'x')
+# Common CBM shape "L*W*H" / "LxWxH" with plain decimal dims, matched in one call.
+# Groups: dim1, dim2 (for '*'), dim2 (for 'x'/'X'), dim3. Anything else takes the split path.
+_CBM_DIM = r'([0-9]+(?:\.[0-9]*)?|\.[0-9]+)'
+_CBM_RE = re.compile(
+    r'\s*' + _CBM_DIM + r'\s*(?:\*\s*' + _CBM_DIM + r'\s*\*|[xX]\s*' + _CBM_DIM + r'\s*[xX])\s*' + _CBM_DIM + r'\s*'
+)
 from .validation import DataValidationError
 from .util.converters import DataConverter
 # Safely link the local legacy name to the new centralized utility
 _convert_to_decimal = DataConverter.convert_to_decimal
 
 
+logger = logging.getLogger(__name__)
+
+
 class ProcessingError(Exception):
     """Custom exception for data processing errors."""
     pass
 
 
+class _LazyContext:
+    """Log context whose text is only built when it is rendered (e.g. in a warning)."""
+    __slots__ = ('fmt', 'args')
+
+    def __init__(self, fmt: str, *args: Any):
+        self.fmt = fmt
+        self.args = args
+
+    def __str__(self) -> str:
+        return self.fmt % self.args
+
+
 # _convert_to_decimal is now imported from .validation
 
 # _calculate_single_cbm function remains unchanged...
@@ -39,51 +83,66 @@ def _calculate_single_cbm(cbm_value: Any, row_index: int) -> Optional[decimal.De
         The calculated CBM as a Decimal, or None if parsing fails or input is invalid.
     """
     prefix = "[_calculate_single_cbm]"
-    log_context = f"for CBM at row index {row_index}" # Use 0-based index internally
+    log_context = _LazyContext("for CBM at row index %d", row_index) # Use 0-based index internally
+    debug_enabled = logger.isEnabledFor(logging.DEBUG)
 
     if cbm_value is None:
-        logging.debug(f"{prefix} Input CBM value is None. {log_context}")
+        if debug_enabled:
+            logger.debug("%s Input CBM value is None. %s", prefix, log_context)
         return None
 
     # If it's already a number, convert to Decimal and quantize
     if isinstance(cbm_value, (int, float, decimal.Decimal)):
-        logging.debug(f"{prefix} Input CBM is already numeric: {cbm_value}. {log_context}")
+        if debug_enabled:
+            logger.debug("%s Input CBM is already numeric: %s. %s", prefix, cbm_value, log_context)
         calculated = DataConverter.convert_to_decimal(cbm_value, log_context)
         if calculated is not None:
              result = calculated.quantize(CBM_DECIMAL_PLACES, rounding=decimal.ROUND_HALF_UP)
-             logging.debug(f"{prefix} Quantized pre-numeric CBM to {result}. {log_context}")
+             if debug_enabled:
+                 logger.debug("%s Quantized pre-numeric CBM to %s. %s", prefix, result, log_context)
              return result
         else:
              # Conversion should ideally not fail here, but handle it
-             logging.warning(f"{prefix} Failed to convert pre-numeric CBM value {cbm_value} to Decimal. {log_context}")
+             logger.warning("%s Failed to convert pre-numeric CBM value %s to Decimal. %s", prefix, cbm_value, log_context)
              return None
 
 
     if not isinstance(cbm_value, str):
-        logging.warning(f"{prefix} Unexpected type '{type(cbm_value).__name__}' for CBM value '{cbm_value}'. Cannot calculate. {log_context}")
+        logger.warning("%s Unexpected type '%s' for CBM value '%s'. Cannot calculate. %s", prefix, type(cbm_value).__name__, cbm_value, log_context)
         return None
 
     cbm_str = cbm_value.strip()
     if not cbm_str:
-        logging.debug(f"{prefix} Input CBM string is empty after strip. {log_context}")
+        if debug_enabled:
+            logger.debug("%s Input CBM string is empty after strip. %s", prefix, log_context)
         return None
 
-    logging.debug(f"{prefix} Attempting to parse CBM string: '{cbm_str}'. {log_context}")
+    if debug_enabled:
+        logger.debug("%s Attempting to parse CBM string: '%s'. %s", prefix, cbm_str, log_context)
+
+    # Fast path: well-formed "L*W*H" / "LxWxH" with plain numbers needs no further validation
+    match = _CBM_RE.fullmatch(cbm_str)
+    if match is not None:
+        dim1, dim2_star, dim2_x, dim3 = match.groups()
+        volume = (decimal.Decimal(dim1) * decimal.Decimal(dim2_star or dim2_x) * decimal.Decimal(dim3)).quantize(
+            CBM_DECIMAL_PLACES, rounding=decimal.ROUND_HALF_UP)
+        if debug_enabled:
+            logger.debug("%s Calculated CBM volume: %s from '%s'. %s", prefix, volume, cbm_str, log_context)
+        return volume
 
     # Try splitting by '*' first
     parts = cbm_str.split('*')
-    separator_used = "'*'"
 
     # If not 3 parts, try splitting by 'x' or 'X' (case-insensitive)
     if len(parts) != 3:
-        if '*' not in cbm_str and ('x' in cbm_str.lower()):
-             parts = re.split(r'[xX]', cbm_str) # Split by 'x' or 'X'
-             separator_used = "'x' or 'X'"
-             logging.debug(f"{prefix} Split by '*' failed, trying split by {separator_used}. Parts: {parts}. {log_context}")
+        if '*' not in cbm_str and ('x' in cbm_str or 'X' in cbm_str):
+             parts = cbm_str.translate(_CBM_X_TRANSLATE).split('x') # Split by 'x' or 'X'
+             if debug_enabled:
+                 logger.debug("%s Split by '*' failed, trying split by 'x' or 'X'. Parts: %s. %s", prefix, parts, log_context)
 
     # Check if we have exactly 3 parts after trying separators
     if len(parts) != 3:
-        logging.warning(f"{prefix} Invalid CBM format: '{cbm_str}'. Expected 3 parts separated by '*' or 'x'. Found {len(parts)} parts: {parts}. {log_context}")
+        logger.warning("%s Invalid CBM format: '%s'. Expected 3 parts separated by '*' or 'x'. Found %d parts: %s. %s", prefix, cbm_str, len(parts), parts, log_context)
         return None
 
     try:
@@ -91,23 +150,24 @@ def _calculate_single_cbm(cbm_value: Any, row_index: int) -> Optional[decimal.De
         dims = []
         valid_dims = True
         for i, part in enumerate(parts):
-             dim = DataConverter.convert_to_decimal(part, f"{log_context}, part {i+1} ('{part}')")
+             dim = DataConverter.convert_to_decimal(part, _LazyContext("%s, part %d ('%s')", log_context, i + 1, part))
              if dim is None:
-                 logging.warning(f"{prefix} Failed to convert dimension part {i+1} ('{part}') to Decimal. {log_context}")
+                 logger.warning("%s Failed to convert dimension part %d ('%s') to Decimal. %s", prefix, i + 1, part, log_context)
                  valid_dims = False
              dims.append(dim)
 
         if not valid_dims:
-            logging.warning(f"{prefix} Failed to convert one or more dimensions for CBM string '{cbm_str}'. Cannot calculate volume. {log_context}")
+            logger.warning("%s Failed to convert one or more dimensions for CBM string '%s'. Cannot calculate volume. %s", prefix, cbm_str, log_context)
             return None
 
         dim1, dim2, dim3 = dims
         volume = (dim1 * dim2 * dim3).quantize(CBM_DECIMAL_PLACES, rounding=decimal.ROUND_HALF_UP)
-        logging.debug(f"{prefix} Calculated CBM volume: {volume} from '{cbm_str}' (Dims: {dims}). {log_context}")
+        if debug_enabled:
+            logger.debug("%s Calculated CBM volume: %s from '%s' (Dims: %s). %s", prefix, volume, cbm_str, dims, log_context)
         return volume
 
     except Exception as e:
-        logging.error(f"{prefix} Unexpected error calculating CBM from '{cbm_str}': {e}. {log_context}", exc_info=True)
+        logger.error("%s Unexpected error calculating CBM from '%s': %s. %s", prefix, cbm_str, e, log_context, exc_info=True)
         return None
 
 
@@ -240,7 +300,7 @@ def normalize_pallet_count(table_data: List[Dict[str, Any]]) -> List[Dict[str, A
                 continue
             
             try:
-                int_val = int(float(str(raw_val).strip()))
+                int_val = raw_val if type(raw_val) is int else int(float(str(raw_val).strip()))
                 row[pallet_key] = 1 if int_val >= 1 else 0
                 if row[pallet_key] == 1:
                     normalized_count += 1
@@ -270,6 +330,9 @@ def process_cbm_column(raw_data: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
 
     logging.info(f"{prefix} Processing '{cbm_key}' column for volume calculations (Rows: {len(raw_data)})...")
 
+    # Carton sizes repeat heavily, so each distinct CBM string is parsed only once
+    volumes_by_str: Dict[str, Optional[decimal.Decimal]] = {}
+
     # Process each row in the list
     for i, row in enumerate(raw_data):
         if cbm_key in row:
@@ -278,8 +341,12 @@ def process_cbm_column(raw_data: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
             # Save the raw string before calculating
             if isinstance(value, str):
                 row['col_cbm_raw'] = value.strip()
-            
-            calculated_value = _calculate_single_cbm(value, i) # Calculate volume using the helper
+                if value in volumes_by_str:
+                    calculated_value = volumes_by_str[value]
+                else:
+                    calculated_value = volumes_by_str[value] = _calculate_single_cbm(value, i)
+            else:
+                calculated_value = _calculate_single_cbm(value, i) # Calculate volume using the helper
             row[cbm_key] = calculated_value # Replace string with Decimal or None
 
     logging.info(f"{prefix} Finished processing '{cbm_key}' column. Rows updated with calculated values (Decimals or Nones).")
@@ -454,7 +521,7 @@ def normalize_by_pallet_anchor(
                         except (decimal.InvalidOperation, ValueError, TypeError):
                             pass  # Can't convert — leave it
 
-                logging.debug(f"{prefix} Pulled up values from row {member_idx} to anchor row {anchor_idx}")
+                logging.debug("%s Pulled up values from row %d to anchor row %d", prefix, member_idx, anchor_idx)
                 
                 # Emit a user-visible warning via the monitor with exact values
                 if monitor and moved_details:
@@ -480,22 +547,305 @@ def normalize_by_pallet_anchor(
     return result
 
 
+# Row kinds produced by _plan_distribution
+_DIST_ZERO = 0       # row becomes 0
+_DIST_KEEP = 1       # row keeps its original value
+_DIST_SHARE = 2      # row receives its proportion of the block's anchor value
+_DIST_SINGLE = 3     # only row with a valid basis in its block: receives the whole anchor value
+_DIST_REMAINDER = 4  # last valid row of its block: anchor value minus the other shares
+
+def _to_float_array(values: List[Optional[decimal.Decimal]]) -> Optional[np.ndarray]:
+    """
+    Converts a list of Optional Decimals to float64, with None as NaN.
+    Returns None when a value has no finite float64 equivalent (Decimal NaN/Infinity or
+    out of range), in which case the caller must use the exact Decimal path.
+    """
+    try:
+        arr = np.array([np.nan if v is None else float(v) for v in values], dtype=np.float64)
+    except ValueError:  # signalling NaN
+        return None
+
+    missing = np.isnan(arr)
+    if not np.isfinite(arr[~missing]).all():
+        return None
+    if missing.any() and any(v is not None and v.is_nan() for v in values):
+        return None
+    return arr
+
+
+def _plan_distribution(basis_arr: np.ndarray, col_arr: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Works out how block distribution fills one column, using float64 arrays (NaN = missing).
+    A block starts at a non-zero value (the anchor) and runs up to the next anchor.
+
+    The plan is built for all blocks at once with NumPy array operations.
+
+    Returns:
+        (kind, props, owner): per-row _DIST_* code, share of the block basis, and the
+        anchor index of the block the row belongs to (-1 outside distributed blocks).
+    """
+    num_rows = col_arr.shape[0]
+    kind = np.full(num_rows, _DIST_ZERO, dtype=np.int8)
+    props = np.zeros(num_rows, dtype=np.float64)
+    owner = np.full(num_rows, -1, dtype=np.int64)
+
+    is_anchor = ~np.isnan(col_arr) & (col_arr != 0)
+    anchors = np.flatnonzero(is_anchor)
+    if anchors.size == 0:
+        return kind, props, owner
+    kind[anchors] = _DIST_KEEP
+
+    # Block number of every row (-1 before the first anchor) and per-block sizes
+    block = np.cumsum(is_anchor) - 1
+    block_size = np.diff(np.append(anchors, num_rows))
+    in_multi_row_block = np.zeros(num_rows, dtype=bool)
+    in_multi_row_block[anchors[0]:] = block_size[block[anchors[0]:]] > 1
+
+    with np.errstate(invalid='ignore'):
+        valid = in_multi_row_block & (basis_arr > 0)
+    valid_rows = np.flatnonzero(valid)
+    if valid_rows.size == 0:
+        return kind, props, owner
+
+    valid_block = block[valid_rows]
+    counts = np.bincount(valid_block, minlength=anchors.size)
+    totals = np.bincount(valid_block, weights=basis_arr[valid_rows], minlength=anchors.size)
+
+    distributed = np.zeros(num_rows, dtype=bool)
+    distributed[anchors[0]:] = in_multi_row_block[anchors[0]:] & (counts[block[anchors[0]:]] > 0)
+    owner[distributed] = anchors[block[distributed]]
+
+    props[valid_rows] = basis_arr[valid_rows] / totals[valid_block]
+    kind[valid_rows] = _DIST_SHARE
+    # The last valid row of each block takes the remainder (or the whole value if it is the only one)
+    last_rows = valid_rows[np.append(valid_block[1:] != valid_block[:-1], True)]
+    kind[last_rows] = np.where(counts[block[last_rows]] == 1, _DIST_SINGLE, _DIST_REMAINDER)
+
+    return kind, props, owner
+
+
+def _distribute_column_float(
+    basis_values_dec: List[Optional[decimal.Decimal]],
+    basis_arr: np.ndarray,
+    current_col_values_dec: List[Optional[decimal.Decimal]],
+    col_arr: np.ndarray,
+    col_name: str,
+    dist_precision: decimal.Decimal,
+    plan_cache: Optional[Dict[bytes, Tuple[np.ndarray, np.ndarray, np.ndarray]]] = None
+) -> List[decimal.Decimal]:
+    """
+    Block distribution of one column with the proportions computed in float64.
+    Shares are quantized back to Decimal and the last valid row of each block takes
+    the remainder, so every block still sums exactly to its anchor value.
+    Shares whose float value sits on a rounding tie are recomputed in Decimal.
+
+    The plan only depends on the basis and on where the anchors are, so columns with
+    the same anchor rows (e.g. net/gross/amount) share one entry of plan_cache.
+    """
+    prefix = "[distribute_values]"
+    is_anchor = ~np.isnan(col_arr) & (col_arr != 0)
+
+    # Same data-quality warning as the exact path: rows inside a block (after its anchor)
+    # whose basis is missing
+    block = np.cumsum(is_anchor) - 1
+    missing_basis = np.flatnonzero(np.isnan(basis_arr) & ~is_anchor & (block >= 0))
+    if missing_basis.size:
+        anchors = np.flatnonzero(is_anchor)
+        for k, i in zip(missing_basis.tolist(), anchors[block[missing_basis]].tolist()):
+            logger.warning("%s Col '%s', Row index %d: Lookahead index %d has MISSING basis. Will assign 0 later.", prefix, col_name, i, k)
+
+    if plan_cache is None:
+        kind, props, owner = _plan_distribution(basis_arr, col_arr)
+    else:
+        anchor_key = is_anchor.tobytes()
+        plan = plan_cache.get(anchor_key)
+        if plan is None:
+            plan = plan_cache[anchor_key] = _plan_distribution(basis_arr, col_arr)
+        kind, props, owner = plan
+    shares = props * col_arr[owner]
+
+    # Shares are rounded in integer units of dist_precision (e.g. ten-thousandths) and only
+    # turned into Decimals at the end. Float error can only flip ROUND_HALF_UP when the scaled
+    # share is (nearly) on a .5 boundary; those rows are recomputed in Decimal. The relative
+    # tolerance also covers inputs with more significant digits than float64 holds.
+    exponent = dist_precision.as_tuple().exponent
+    scaled = shares * (10 ** -exponent)
+    units = np.rint(scaled)
+    abs_scaled = np.abs(scaled)
+    on_tie = np.abs(abs_scaled - np.floor(abs_scaled) - 0.5) <= abs_scaled * 1e-10 + 1e-9
+
+    # Local bindings for the per-row loop (LOAD_FAST instead of global/attribute lookups)
+    Dec = decimal.Decimal
+    dec_zero = _DEC_ZERO
+    half_up = decimal.ROUND_HALF_UP
+    dist_zero, dist_keep, dist_share, dist_single = _DIST_ZERO, _DIST_KEEP, _DIST_SHARE, _DIST_SINGLE
+
+    # Rows that become 0 keep the shared zero; only the other rows are visited
+    processed_col_values = [dec_zero] * kind.shape[0]
+    rows = np.flatnonzero(kind != dist_zero)
+    block_owner = -1
+    block_units = 0
+    block_total = None
+    for k, row_kind, share, unit, anchor, tie in zip(
+            rows.tolist(), kind[rows].tolist(), shares[rows].tolist(), units[rows].tolist(),
+            owner[rows].tolist(), on_tie[rows].tolist()):
+        if anchor != block_owner:
+            block_owner = anchor
+            block_units = 0
+            block_total = None
+
+        if row_kind == dist_keep:
+            processed_col_values[k] = current_col_values_dec[k]
+        elif row_kind == dist_share:
+            if tie:
+                if block_total is None:
+                    block_rows = np.nonzero((owner == anchor) & (kind >= dist_share))[0].tolist()
+                    block_total = sum(basis_values_dec[j] for j in block_rows)
+                exact_share = current_col_values_dec[anchor] * (basis_values_dec[k] / block_total)
+                value = exact_share.quantize(dist_precision, rounding=half_up)
+                block_units += int(value.scaleb(-exponent))
+            else:
+                share_units = int(unit)
+                value = Dec(share_units).scaleb(exponent)
+                if share_units == 0 and share < 0:
+                    value = value.copy_negate()  # keep quantize()'s signed zero
+                block_units += share_units
+            processed_col_values[k] = value
+        elif row_kind == dist_single:
+            processed_col_values[k] = current_col_values_dec[anchor].quantize(dist_precision, rounding=half_up)
+        else:
+            anchor_dec = current_col_values_dec[anchor]
+            if anchor_dec.as_tuple().exponent >= exponent:
+                # Anchor sits on the unit grid: the remainder is exact integer arithmetic
+                remainder_units = int(anchor_dec.scaleb(-exponent)) - block_units
+                processed_col_values[k] = Dec(remainder_units).scaleb(exponent)
+            else:
+                remainder = anchor_dec - Dec(block_units).scaleb(exponent)
+                processed_col_values[k] = remainder.quantize(dist_precision, rounding=half_up)
+
+    return processed_col_values
+
+
+def _distribute_column_exact(
+    basis_values_dec: List[Optional[decimal.Decimal]],
+    current_col_values_dec: List[Optional[decimal.Decimal]],
+    col_name: str
+) -> List[decimal.Decimal]:
+    """
+    Block distribution of one column carried out entirely in Decimal.
+    Used when values carry more significant digits than float64 can hold.
+    """
+    prefix = "[distribute_values]"
+    num_rows = len(current_col_values_dec)
+
+    # Rows before the first anchor, rows without a valid basis and rows of undistributable
+    # blocks are never written and keep the shared zero
+    processed_col_values: List[decimal.Decimal] = [_DEC_ZERO] * num_rows
+    dist_precision = CBM_DECIMAL_PLACES if col_name == 'col_cbm' else DEFAULT_DIST_PRECISION
+    tolerance = _TOLERANCE_CBM if col_name == 'col_cbm' else _TOLERANCE_DEF
+    check_enabled = logger.isEnabledFor(logging.DEBUG)
+
+    # One forward scan for the anchors (non-None, non-zero values); each block runs to the next anchor
+    anchors = [k for k, v in enumerate(current_col_values_dec) if v is not None and v != _DEC_ZERO]
+    block_ends = anchors[1:] + [num_rows]
+
+    for i, j in zip(anchors, block_ends):
+        current_val_dec = current_col_values_dec[i]
+        processed_col_values[i] = current_val_dec
+        if j - i == 1:
+            continue
+
+        block_basis = basis_values_dec[i:j]
+        if all(b is not None and b > 0 for b in block_basis):
+            # Common case: every row of the block has a positive basis, no validity bookkeeping needed
+            total_basis_in_block = sum(block_basis, _DEC_ZERO)
+            indices_with_valid_basis = range(i, j)
+        else:
+            for k in range(i + 1, j):
+                if basis_values_dec[k] is None:
+                    logger.warning("%s Col '%s', Row index %d: Lookahead index %d has MISSING basis. Will assign 0 later.", prefix, col_name, i, k)
+
+            total_basis_in_block = _DEC_ZERO
+            indices_with_valid_basis = []
+            for k in range(i, j):
+                basis_val = basis_values_dec[k]
+                if basis_val is not None and basis_val > 0:
+                    total_basis_in_block += basis_val
+                    indices_with_valid_basis.append(k)
+
+        if total_basis_in_block > 0 and indices_with_valid_basis:
+            num_valid_indices = len(indices_with_valid_basis)
+
+            if num_valid_indices == 1:
+                k = indices_with_valid_basis[0]
+                processed_col_values[k] = current_val_dec.quantize(dist_precision, rounding=decimal.ROUND_HALF_UP)
+            else:
+                shares_sum = _DEC_ZERO
+                for k in indices_with_valid_basis[:-1]:
+                    basis_val = basis_values_dec[k]
+                    proportion = basis_val / total_basis_in_block
+                    distributed_value = (current_val_dec * proportion).quantize(dist_precision, rounding=decimal.ROUND_HALF_UP)
+                    processed_col_values[k] = distributed_value
+                    shares_sum += distributed_value
+
+                last_idx = indices_with_valid_basis[-1]
+                remainder = current_val_dec - shares_sum
+                processed_col_values[last_idx] = remainder.quantize(dist_precision, rounding=decimal.ROUND_HALF_UP)
+
+            # The last row absorbs the rounding, so a block is off by at most half a unit of
+            # dist_precision by construction; the sum check only runs in debug builds/logging
+            if __debug__ and check_enabled:
+                distributed_sum_check = sum((processed_col_values[k] for k in indices_with_valid_basis), _DEC_ZERO)
+                diff = abs(distributed_sum_check - current_val_dec)
+                if not diff <= tolerance:
+                    logger.warning("%s Col '%s', Row index %d: Distribution Check potentially FAILED for block. Diff: %.10f", prefix, col_name, i, diff)
+
+    return processed_col_values
+
+
+def _distribute_one_column(
+    basis_values_dec: List[Optional[decimal.Decimal]],
+    basis_arr: Optional[np.ndarray],
+    current_col_values_dec: List[Optional[decimal.Decimal]],
+    col_name: str,
+    plan_cache: Optional[Dict[bytes, Tuple[np.ndarray, np.ndarray, np.ndarray]]] = None
+) -> List[decimal.Decimal]:
+    """
+    Block distribution of one column from plain value lists (no row dicts involved).
+    Uses the float64 path when basis_arr is given and the column fits float64,
+    otherwise the exact Decimal path. plan_cache is reused across the columns of one
+    distribute_values call (same basis).
+    """
+    col_arr = None if basis_arr is None else _to_float_array(current_col_values_dec)
+    with decimal.localcontext(_DECIMAL_CONTEXT):
+        if col_arr is None:
+            logger.debug("[distribute_values] Using exact Decimal distribution for '%s'.", col_name)
+            return _distribute_column_exact(basis_values_dec, current_col_values_dec, col_name)
+
+        dist_precision = CBM_DECIMAL_PLACES if col_name == 'col_cbm' else DEFAULT_DIST_PRECISION
+        return _distribute_column_float(basis_values_dec, basis_arr, current_col_values_dec, col_arr, col_name, dist_precision, plan_cache)
+
+
 # distribute_values function remains unchanged...
 def distribute_values(
     raw_data: List[Dict[str, Any]],
     columns_to_distribute: List[str],
-    basis_column: str
+    basis_column: str,
+    exact_decimal: bool = False
 ) -> List[Dict[str, Any]]:
     """
     Distributes values in specified columns based on proportions in the basis column.
     Operates on the input raw_data (which might have pre-calculated CBM).
     Handles pre-calculated CBM decimals correctly. Modifies data in place.
+
+    Proportions are computed with NumPy in float64; set exact_decimal to force the
+    all-Decimal path (also used automatically for values float64 cannot hold).
     """
     prefix = "[distribute_values]"
-    logging.debug(f"{prefix} Starting value distribution process.")
+    logger.debug("%s Starting value distribution process.", prefix)
 
     if not raw_data:
-        logging.warning(f"{prefix} Received empty raw_data list. Skipping distribution.")
+        logger.warning("%s Received empty raw_data list. Skipping distribution.", prefix)
         return []
 
     processed_data = raw_data
@@ -503,16 +853,11 @@ def distribute_values(
     # --- Find Basis Column Canonical Name ---
     candidate_basis = basis_column
     if not candidate_basis.startswith('col_'):
-        if basis_column == 'pcs':
-             candidate_basis = 'col_qty_pcs'
-        elif basis_column == 'sqft':
-             candidate_basis = 'col_qty_sf'
-        else:
-             candidate_basis = f"col_{basis_column}"
+        candidate_basis = _LEGACY_TO_CANON.get(basis_column, f"col_{basis_column}")
     
     # Check if basis exists anywhere
     if not any(candidate_basis in row for row in processed_data):
-        logging.error(f"{prefix} Basis column '{basis_column}' (or '{candidate_basis}') not found in any row. Cannot distribute.")
+        logger.error("%s Basis column '%s' (or '%s') not found in any row. Cannot distribute.", prefix, basis_column, candidate_basis)
         raise ProcessingError(f"Basis column '{basis_column}' not found for distribution.")
     
     basis_column = candidate_basis
@@ -522,144 +867,198 @@ def distribute_values(
         for col in columns_to_distribute:
             target_col = col
             if not target_col.startswith('col_'):
-                if target_col == 'net': target_col = 'col_net'
-                elif target_col == 'gross': target_col = 'col_gross'
-                elif target_col == 'cbm': target_col = 'col_cbm'
-                elif target_col == 'sqft': target_col = 'col_qty_sf'
-                elif target_col == 'pcs': target_col = 'col_qty_pcs'
-                elif target_col == 'amount': target_col = 'col_amount'
-                elif target_col == 'pallet_count': target_col = 'col_pallet_count'
-                else: target_col = f"col_{target_col}"
+                target_col = _LEGACY_TO_CANON.get(col, f"col_{col}")
 
             # Only add to valid if it appears in at least one row
             if any(target_col in row for row in processed_data):
                 valid_columns_to_distribute.append(target_col)
             else:
-                logging.warning(f"{prefix} Column '{col}' (mapped to '{target_col}') not found in any row. Skipping.")
+                logger.warning("%s Column '%s' (mapped to '%s') not found in any row. Skipping.", prefix, col, target_col)
     else:
-        logging.info(f"{prefix} No columns specified in 'columns_to_distribute' list. Skipping distribution.")
+        logger.info("%s No columns specified in 'columns_to_distribute' list. Skipping distribution.", prefix)
         return processed_data
 
     if not valid_columns_to_distribute:
-         logging.warning(f"{prefix} No valid columns found to perform distribution on. Requested: {columns_to_distribute}")
+         logger.warning("%s No valid columns found to perform distribution on. Requested: %s", prefix, columns_to_distribute)
          return processed_data
 
     num_rows = len(processed_data)
-    logging.info(f"{prefix} Starting value distribution for columns: {valid_columns_to_distribute} based on '{basis_column}' ({num_rows} rows).")
+    logger.info("%s Starting value distribution for columns: %s based on '%s' (%d rows).", prefix, valid_columns_to_distribute, basis_column, num_rows)
 
     # Pre-convert basis values to Decimal
-    basis_values_dec: List[Optional[decimal.Decimal]] = [
-        _convert_to_decimal(row.get(basis_column), f"{prefix} basis column '{basis_column}' row index {i}")
-        for i, row in enumerate(processed_data)
-    ]
-    logging.debug(f"{prefix} Pre-converted basis values (first 10): {basis_values_dec[:10]}")
+    # No per-row context string: the converter's warning already names the offending value
+    basis_values_dec: List[Optional[decimal.Decimal]] = list(
+        map(_convert_to_decimal, [row.get(basis_column) for row in processed_data])
+    )
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("%s Pre-converted basis values (first 10): %s", prefix, basis_values_dec[:10])
+    basis_arr = None if exact_decimal else _to_float_array(basis_values_dec)
+    plan_cache: Dict[bytes, Tuple[np.ndarray, np.ndarray, np.ndarray]] = {}
 
     # --- Process each column ---
     for col_name in valid_columns_to_distribute:
-        logging.info(f"{prefix} Processing column for distribution: '{col_name}'")
+        logger.info("%s Processing column for distribution: '%s'", prefix, col_name)
 
         # Pre-convert original values for the column being distributed
-        current_col_values_dec: List[Optional[decimal.Decimal]] = [
-             val if isinstance((val := row.get(col_name)), decimal.Decimal)
-             else _convert_to_decimal(val, f"{prefix} column '{col_name}' row index {i}")
-             for i, row in enumerate(processed_data)
-        ]
-
-        # Initialize processed list for this column
-        processed_col_values: List[Optional[decimal.Decimal]] = [None] * num_rows
-
-        i = 0
-        while i < num_rows:
-            current_val_dec = current_col_values_dec[i]
-            log_row_context = f"{prefix} Col '{col_name}', Row index {i}"
-
-            # --- Case 1: Found a non-None, non-zero value to potentially distribute ---
-            if current_val_dec is not None and current_val_dec != decimal.Decimal(0):
-                processed_col_values[i] = current_val_dec
-
-                # --- Look ahead for the distribution block ---
-                j = i + 1 
-                distribution_rows_indices = []
-                while j < num_rows:
-                     next_original_val_dec = current_col_values_dec[j]
-                     if next_original_val_dec is not None and next_original_val_dec != decimal.Decimal(0):
-                          break
-
-                     basis_for_j = basis_values_dec[j]
-                     if basis_for_j is not None:
-                          distribution_rows_indices.append(j)
-                     else:
-                          distribution_rows_indices.append(j)
-                          logging.warning(f"{log_row_context}: Lookahead index {j} has MISSING basis. Will assign 0 later.")
-                     j += 1
-
-                if distribution_rows_indices:
-                    block_indices = [i] + distribution_rows_indices
-                    total_basis_in_block = decimal.Decimal(0)
-                    indices_with_valid_basis = []
-
-                    for k in block_indices:
-                        basis_val = basis_values_dec[k]
-                        if basis_val is not None and basis_val > 0:
-                            total_basis_in_block += basis_val
-                            indices_with_valid_basis.append(k)
-
-                    if total_basis_in_block > 0 and indices_with_valid_basis:
-                         distributed_sum_check = decimal.Decimal(0)
-                         dist_precision = CBM_DECIMAL_PLACES if col_name == 'col_cbm' else DEFAULT_DIST_PRECISION
-
-                         num_valid_indices = len(indices_with_valid_basis)
-                         
-                         if num_valid_indices == 1:
-                             k = indices_with_valid_basis[0]
-                             processed_col_values[k] = current_val_dec.quantize(dist_precision, rounding=decimal.ROUND_HALF_UP)
-                             distributed_sum_check = processed_col_values[k]
-                         else:
-                             for k in indices_with_valid_basis[:-1]:
-                                 basis_val = basis_values_dec[k]
-                                 proportion = basis_val / total_basis_in_block
-                                 distributed_value = (current_val_dec * proportion).quantize(dist_precision, rounding=decimal.ROUND_HALF_UP)
-                                 processed_col_values[k] = distributed_value
-                                 distributed_sum_check += distributed_value
-                             
-                             last_idx = indices_with_valid_basis[-1]
-                             remainder = current_val_dec - distributed_sum_check
-                             processed_col_values[last_idx] = remainder.quantize(dist_precision, rounding=decimal.ROUND_HALF_UP)
-                             distributed_sum_check += processed_col_values[last_idx]
-
-                         for k in block_indices:
-                             if k not in indices_with_valid_basis:
-                                 if processed_col_values[k] is None:
-                                     processed_col_values[k] = decimal.Decimal(0)
-
-                         tolerance = dist_precision / decimal.Decimal(2)
-                         diff = abs(distributed_sum_check - current_val_dec)
-                         if not diff <= tolerance:
-                              logging.warning(f"{log_row_context}: Distribution Check potentially FAILED for block. Diff: {diff:.10f}")
-
-                    else:
-                        for k in distribution_rows_indices:
-                            if processed_col_values[k] is None:
-                                processed_col_values[k] = decimal.Decimal(0)
-
-                    i = j
-                else:
-                    i += 1
+        current_col_values_dec: List[Optional[decimal.Decimal]] = list(
+            map(_convert_to_decimal, [row.get(col_name) for row in processed_data])
+        )
 
-            # --- Case 2: Current original value is None or zero ---
-            else:
-                if processed_col_values[i] is None:
-                    processed_col_values[i] = decimal.Decimal(0)
-                i += 1
+        processed_col_values = _distribute_one_column(basis_values_dec, basis_arr, current_col_values_dec, col_name, plan_cache)
 
         # Push calculated values back into row dicts
-        for idx, row in enumerate(processed_data):
-             if processed_col_values[idx] is not None:
-                  row[col_name] = processed_col_values[idx]
+        for row, value in zip(processed_data, processed_col_values):
+             row[col_name] = value
 
-    logging.info(f"{prefix} Value distribution processing COMPLETED for all requested columns.")
+    logger.info("%s Value distribution processing COMPLETED for all requested columns.", prefix)
     return processed_data
 
+
+def _columns_present(processed_data: List[Dict[str, Any]], columns: List[str]) -> set:
+    """
+    Returns the subset of `columns` that appear in at least one row, in a single walk
+    over the rows that stops as soon as every column has been seen.
+    """
+    remaining = set(columns)
+    found = set()
+    for row in processed_data:
+        hits = [col for col in remaining if col in row]
+        if hits:
+            found.update(hits)
+            remaining.difference_update(hits)
+            if not remaining:
+                break
+    return found
+
+
+def _new_aggregate_sums() -> Dict[str, decimal.Decimal]:
+    """Fresh per-key sums for the aggregation maps (the shared zero is safe: += rebinds)."""
+    return {'sqft_sum': _DEC_ZERO, 'amount_sum': _DEC_ZERO, 'net_sum': _DEC_ZERO}
+
+
+def _build_aggregation_keys(
+    processed_data: List[Dict[str, Any]],
+    prices: Optional[List[Optional[decimal.Decimal]]] = None
+) -> List[Tuple[Any, Any, Optional[decimal.Decimal], Optional[str]]]:
+    """
+    (PO, Item, Price, Description) key for every row, built in a single pass.
+    PO/Item strings are stripped and None becomes "<MISSING_PO>"/"<MISSING_ITEM>";
+    description strings are stripped and empty/falsy descriptions become None.
+    prices holds the per-row price component; without it (custom aggregation) it is None.
+
+    Strings are interned: the same PO/Item recurs across rows and tables, so key tuples
+    share one object per value and dict probes in the aggregation maps compare by identity.
+    """
+    intern = sys.intern
+    row_keys = []
+    append = row_keys.append
+    for row, price in zip(processed_data, prices if prices is not None else repeat(None)):
+        po_val, item_val, desc_val = row.get('col_po'), row.get('col_item'), row.get('col_desc')
+        append((
+            intern(po_val.strip()) if isinstance(po_val, str) else ("<MISSING_PO>" if po_val is None else po_val),
+            intern(item_val.strip()) if isinstance(item_val, str) else ("<MISSING_ITEM>" if item_val is None else item_val),
+            price,
+            (intern(desc_val.strip()) if isinstance(desc_val, str) else desc_val) or None,
+        ))
+    return row_keys
+
+
+def _price_to_decimal(raw: Any) -> Optional[decimal.Decimal]:
+    """Unit price -> Decimal for the standard aggregation key."""
+    return DataConverter.convert_to_decimal(raw, "[aggregate_standard] price")
+
+
+def _convert_column(values: List[Any], context: str) -> List[Optional[decimal.Decimal]]:
+    """Converts a whole column to Decimal in one pass."""
+    convert = _convert_to_decimal
+    return [convert(value, context) for value in values]
+
+
+class _AggregationInputs:
+    """
+    Per-table values shared by the standard and custom aggregations, computed on first use:
+    the key tuples without price and the Decimal SQFT / Amount / Net columns.
+    """
+    __slots__ = ('processed_data', '_keys_without_price', '_sum_columns')
+
+    def __init__(self, processed_data: List[Dict[str, Any]]):
+        self.processed_data = processed_data
+        self._keys_without_price = None
+        self._sum_columns = None
+
+    def keys_without_price(self) -> List[Tuple[Any, Any, None, Optional[str]]]:
+        if self._keys_without_price is None:
+            self._keys_without_price = _build_aggregation_keys(self.processed_data)
+        return self._keys_without_price
+
+    def sum_columns(self) -> Tuple[List[Optional[decimal.Decimal]], ...]:
+        """(SQFT, Amount, Net) converted once for the whole table."""
+        if self._sum_columns is None:
+            # Per-column context only: the converter's warning already names the offending value
+            rows = self.processed_data
+            self._sum_columns = (
+                _convert_column([row.get('col_qty_sf') for row in rows], "[aggregate] SQFT"),
+                _convert_column([row.get('col_amount') for row in rows], "[aggregate] Amount"),
+                _convert_column([row.get('col_net') for row in rows], "[aggregate] Net"),
+            )
+        return self._sum_columns
+
+
+def _add_grouped_sums(
+    aggregated_results: Dict[Tuple, Dict[str, Any]],
+    row_keys: List[Tuple],
+    inputs: _AggregationInputs
+) -> Tuple[int, int]:
+    """
+    Adds SQFT, Amount and Net of every row into aggregated_results[row_keys[i]] and joins
+    the col_cbm_raw strings. Rows are bucketed by key first and each bucket is then summed
+    with one builtin sum() per column, so the per-row work is a single dict lookup.
+    Values are still added in row order, giving the same Decimals as a row-by-row loop.
+
+    Returns:
+        (number of successful SQFT conversions, number of successful Amount conversions)
+    """
+    # Hash aggregation phase: row indices per key, keys in first-seen order
+    groups: Dict[Tuple, List[int]] = {}
+    get_members = groups.get
+    for i, key in enumerate(row_keys):
+        members = get_members(key)
+        if members is None:
+            groups[key] = [i]
+        else:
+            members.append(i)
+
+    processed_data = inputs.processed_data
+    sqft_all, amount_all, net_all = inputs.sum_columns()
+
+    successful_conversions_sqft = len(sqft_all) - sum(v is None for v in sqft_all)
+    successful_conversions_amount = len(amount_all) - sum(v is None for v in amount_all)
+    with decimal.localcontext(_DECIMAL_CONTEXT):
+        for key, indices in groups.items():
+            current_sums = aggregated_results.get(key)
+            if current_sums is None:
+                current_sums = aggregated_results[key] = _new_aggregate_sums()
+
+            # Failed/missing SQFT and Amount count as 0
+            current_sums['sqft_sum'] = sum([_DEC_ZERO if sqft_all[i] is None else sqft_all[i] for i in indices], current_sums['sqft_sum'])
+            current_sums['amount_sum'] = sum([_DEC_ZERO if amount_all[i] is None else amount_all[i] for i in indices], current_sums['amount_sum'])
+
+            # Aggregate Net Weight where present
+            net_values = [net_all[i] for i in indices if net_all[i] is not None]
+            if net_values:
+                current_sums['net_sum'] = sum(net_values, current_sums['net_sum'])
+
+            # Track col_cbm_raw specifically
+            raw_cbm_values = [processed_data[i].get('col_cbm_raw') for i in indices]
+            raw_cbm_parts = [str(raw) for raw in raw_cbm_values if raw]
+            if raw_cbm_parts:
+                joined = " + ".join(raw_cbm_parts)
+                existing_raw = current_sums.get('col_cbm_raw')
+                current_sums['col_cbm_raw'] = f"{existing_raw} + {joined}" if existing_raw else joined
+
+    return successful_conversions_sqft, successful_conversions_amount
+
+
 # *** Standard Aggregation Function (MODIFIED to handle SQFT, AMOUNT, and DESCRIPTION key) ***
 def aggregate_standard_by_po_item_price(
     processed_data: List[Dict[str, Any]],
@@ -670,106 +1069,56 @@ def aggregate_standard_by_po_item_price(
     combinations of 'po', 'item', 'unit' price, AND 'description'.
     Updates the global_aggregation_map in place.
     """
+    return _aggregate_standard(_AggregationInputs(processed_data), global_aggregation_map)
+
+
+def _aggregate_standard(
+    inputs: _AggregationInputs,
+    global_aggregation_map: Dict[Tuple[Any, Any, Optional[decimal.Decimal], Optional[str]], Dict[str, decimal.Decimal]]
+) -> Dict[Tuple[Any, Any, Optional[decimal.Decimal], Optional[str]], Dict[str, decimal.Decimal]]:
+    processed_data = inputs.processed_data
     aggregated_results = global_aggregation_map
     required_cols = ['col_po', 'col_item', 'col_unit_price', 'col_qty_sf', 'col_amount']
     prefix = "[aggregate_standard]"
 
-    logging.debug(f"{prefix} Updating global STANDARD aggregation (SQFT & Amount by PO/Item/Price/Desc) with new table data.")
-    logging.debug(f"{prefix} Size of global map BEFORE processing this table: {len(aggregated_results)}")
+    logging.debug("%s Updating global STANDARD aggregation (SQFT & Amount by PO/Item/Price/Desc) with new table data.", prefix)
+    logging.debug("%s Size of global map BEFORE processing this table: %d", prefix, len(aggregated_results))
 
     if not processed_data:
         logging.info(f"{prefix} No data rows found in this table. Global map unchanged.")
         return aggregated_results
 
     # Check for required columns existing in at least one row
-    missing_cols = [col for col in required_cols if not any(col in row for row in processed_data)]
+    present_cols = _columns_present(processed_data, required_cols + ['col_desc'])
+    missing_cols = [col for col in required_cols if col not in present_cols]
     if missing_cols:
         logging.warning(f"{prefix} Cannot perform STANDARD aggregation: Missing required columns {missing_cols}. Skipping this table.")
         return aggregated_results
 
-    has_description_col = any('col_desc' in row for row in processed_data)
+    has_description_col = 'col_desc' in present_cols
     if not has_description_col:
         logging.info(f"{prefix} 'col_desc' column not found or is invalid. Will use None for description keys.")
 
     num_rows = len(processed_data)
     logging.info(f"{prefix} Processing {num_rows} rows for STANDARD aggregation (SQFT & Amount by PO/Item/Price/Desc).")
 
-    rows_processed_this_table = 0
-    successful_conversions_sqft = 0
-    successful_conversions_amount = 0
-
-    for i, row in enumerate(processed_data):
-        rows_processed_this_table += 1
-        log_row_context = f"{prefix} Table Row index {i}"
-        
-        po_val, item_val = row.get('col_po'), row.get('col_item')
-        unit_price_raw, sqft_raw, amount_raw = row.get('col_unit_price'), row.get('col_qty_sf'), row.get('col_amount')
-        desc_raw = row.get('col_desc') if has_description_col else None
-
-        logging.debug(f"{log_row_context}: Raw values - PO='{po_val}', Item='{item_val}', Price='{unit_price_raw}', Desc='{desc_raw}', SQFT='{sqft_raw}', Amount='{amount_raw}'")
-
-        # Prepare key components
-        po_key = str(po_val).strip() if isinstance(po_val, str) else po_val
-        item_key = str(item_val).strip() if isinstance(item_val, str) else item_val
-        description_key = str(desc_raw).strip() if isinstance(desc_raw, str) else desc_raw # Keep None as None
-        description_key = description_key if description_key else None # Ensure empty strings become None
-
-        po_key = po_key if po_key is not None else "<MISSING_PO>"
-        item_key = item_key if item_key is not None else "<MISSING_ITEM>"
-        # Description key can be None
-
-        # Convert price to Decimal for the key
-        price_dec = DataConverter.convert_to_decimal(unit_price_raw, f"{log_row_context} price")
-
-        # UPDATED Key: (PO, Item, Price, Description)
-        key = (po_key, item_key, price_dec, description_key)
-        logging.debug(f"{log_row_context}: Generated Key Tuple = {key}")
-
-
-        # Convert SQFT and Amount to Decimal for summation
-        sqft_dec = _convert_to_decimal(sqft_raw, f"{log_row_context} SQFT")
-        if sqft_dec is None:
-             # logging.debug(f"{log_row_context}: SQFT value '{sqft_raw}' is None or failed conversion. Using 0.") # Reduced verbosity
-             sqft_dec = decimal.Decimal(0)
-        else:
-             successful_conversions_sqft +=1
-
-        amount_dec = _convert_to_decimal(amount_raw, f"{log_row_context} Amount")
-        if amount_dec is None:
-            # logging.debug(f"{log_row_context}: Amount value '{amount_raw}' is None or failed conversion. Using 0.") # Reduced verbosity
-            amount_dec = decimal.Decimal(0)
-        else:
-            successful_conversions_amount +=1
+    # Keys for all rows up front: (PO, Item, Price, Description), price converted to Decimal
+    # (without a col_desc column every description key is None)
+    price_keys = [_price_to_decimal(row.get('col_unit_price')) for row in processed_data]
+    row_keys = [(po_key, item_key, price_key, desc_key)
+                for (po_key, item_key, _, desc_key), price_key in zip(inputs.keys_without_price(), price_keys)]
 
-        # logging.debug(f"{log_row_context}: Converted values - SQFT='{sqft_dec}', Amount='{amount_dec}'") # Reduced verbosity
-
-        # --- Add to the global aggregate sums (SQFT, Amount, Net) ---
-        current_sums = aggregated_results.get(key, {'sqft_sum': decimal.Decimal(0), 'amount_sum': decimal.Decimal(0), 'net_sum': decimal.Decimal(0)})
-
-        # Update the sums
-        current_sums['sqft_sum'] += sqft_dec
-        current_sums['amount_sum'] += amount_dec
-        
-        # Aggregate Net Weight if present
-        net_val = row.get('col_net')
-        if net_val is not None:
-            net_dec = _convert_to_decimal(net_val, f"{log_row_context} Net")
-            if net_dec is not None:
-                current_sums['net_sum'] += net_dec
-        
-        # Track col_cbm_raw specifically
-        raw_cbm_val = row.get('col_cbm_raw')
-        if raw_cbm_val:
-            existing_raw = current_sums.get('col_cbm_raw')
-            if existing_raw:
-                current_sums['col_cbm_raw'] = f"{existing_raw} + {raw_cbm_val}"
-            else:
-                current_sums['col_cbm_raw'] = str(raw_cbm_val)
-
-        # Store the updated dictionary back into the global map
-        aggregated_results[key] = current_sums
-        # logging.debug(f"{log_row_context}: Global sums for key {key} AFTER add = {aggregated_results[key]}") # Reduced verbosity
+    # Per-row tracing is only formatted when DEBUG is on for the root logger used here
+    if logging.getLogger().isEnabledFor(logging.DEBUG):
+        for i, (row, key) in enumerate(zip(processed_data, row_keys)):
+            logging.debug("%s Table Row index %d: Raw values - PO='%s', Item='%s', Price='%s', Desc='%s', SQFT='%s', Amount='%s'",
+                          prefix, i, row.get('col_po'), row.get('col_item'), row.get('col_unit_price'),
+                          row.get('col_desc') if has_description_col else None, row.get('col_qty_sf'), row.get('col_amount'))
+            logging.debug("%s Table Row index %d: Generated Key Tuple = %s", prefix, i, key)
 
+    # --- Add to the global aggregate sums (SQFT, Amount, Net) ---
+    rows_processed_this_table = len(row_keys)
+    successful_conversions_sqft, successful_conversions_amount = _add_grouped_sums(aggregated_results, row_keys, inputs)
 
     logging.info(f"{prefix} Finished processing {rows_processed_this_table} rows.")
     logging.info(f"{prefix} SQFT values successfully converted/defaulted for {successful_conversions_sqft} rows.")
@@ -801,19 +1150,28 @@ def aggregate_custom_by_po_item(
     Returns:
         The updated global_custom_aggregation_map.
     """
+    return _aggregate_custom(_AggregationInputs(processed_data), global_custom_aggregation_map)
+
+
+def _aggregate_custom(
+    inputs: _AggregationInputs,
+    global_custom_aggregation_map: Dict[Tuple[Any, Any, None, Optional[str]], Dict[str, decimal.Decimal]]
+) -> Dict[Tuple[Any, Any, None, Optional[str]], Dict[str, decimal.Decimal]]:
+    processed_data = inputs.processed_data
     aggregated_results = global_custom_aggregation_map
     # Required columns for this aggregation (Description is optional)
     required_cols = ['col_po', 'col_item', 'col_qty_sf', 'col_amount']
     prefix = "[aggregate_custom]"
 
-    logging.debug(f"{prefix} Updating global CUSTOM aggregation (SQFT & Amount by PO/Item/Desc) with new table data.")
-    logging.debug(f"{prefix} Size of global custom map BEFORE processing this table: {len(aggregated_results)}")
+    logging.debug("%s Updating global CUSTOM aggregation (SQFT & Amount by PO/Item/Desc) with new table data.", prefix)
+    logging.debug("%s Size of global custom map BEFORE processing this table: %d", prefix, len(aggregated_results))
     # Check for required columns existing in at least one row
-    missing_cols = [col for col in required_cols if not any(col in row for row in processed_data)]
+    present_cols = _columns_present(processed_data, required_cols + ['col_desc'])
+    missing_cols = [col for col in required_cols if col not in present_cols]
     if missing_cols:
         logging.warning(f"{prefix} Cannot perform full CUSTOM aggregation: Missing required columns {missing_cols}. Proceeding cautiously.")
 
-    has_description_col = any('col_desc' in row for row in processed_data)
+    has_description_col = 'col_desc' in present_cols
     if not has_description_col:
         logging.info(f"{prefix} 'col_desc' column not found or is invalid. Will use None for description keys.")
 
@@ -825,71 +1183,12 @@ def aggregate_custom_by_po_item(
     logging.info(f"{prefix} Processing {num_rows} rows from this table to update global CUSTOM aggregation (by PO/Item/Desc).")
 
     # --- Iterate and Aggregate ---
-    rows_processed_this_table = 0
-    successful_conversions_sqft = 0
-    successful_conversions_amount = 0
-
-    for i, row in enumerate(processed_data):
-        rows_processed_this_table += 1
-        log_row_context = f"{prefix} Table Row index {i}"
-        
-        # Get raw values 
-        po_val, item_val = row.get('col_po'), row.get('col_item')
-        sqft_raw, amount_raw = row.get('col_qty_sf'), row.get('col_amount')
-        desc_raw = row.get('col_desc') if has_description_col else None
-
-        # Prepare the key components (Handle None, strip strings)
-        po_key = str(po_val).strip() if isinstance(po_val, str) else po_val
-        item_key = str(item_val).strip() if isinstance(item_val, str) else item_val
-        description_key = str(desc_raw).strip() if isinstance(desc_raw, str) else desc_raw
-        description_key = description_key if description_key else None # Ensure empty strings become None
-
-        po_key = po_key if po_key is not None else "<MISSING_PO>"
-        item_key = item_key if item_key is not None else "<MISSING_ITEM>"
-        # Description key can be None
-
-        # UPDATED Key: (PO, Item, None, Description) - Move description to index 3 to match standard
-        key = (po_key, item_key, None, description_key)
-
-        # Convert SQFT to Decimal for summation (default to 0 if fails/None)
-        sqft_dec = _convert_to_decimal(sqft_raw, f"{log_row_context} SQFT")
-        if sqft_dec is None:
-             sqft_dec = decimal.Decimal(0)
-        else:
-             successful_conversions_sqft +=1
+    # Key: (PO, Item, None, Description) - description at index 3 to match standard
+    row_keys = inputs.keys_without_price()
 
-        # Convert Amount to Decimal for summation (default to 0 if fails/None)
-        amount_dec = _convert_to_decimal(amount_raw, f"{log_row_context} Amount")
-        if amount_dec is None:
-            amount_dec = decimal.Decimal(0)
-        else:
-            successful_conversions_amount +=1
-
-        # --- Add to the global aggregate sums ---
-        current_sums = aggregated_results.get(key, {'sqft_sum': decimal.Decimal(0), 'amount_sum': decimal.Decimal(0), 'net_sum': decimal.Decimal(0)})
-
-        # Update the sums
-        current_sums['sqft_sum'] += sqft_dec
-        current_sums['amount_sum'] += amount_dec
-        
-        # Aggregate Net Weight if present
-        net_val = row.get('col_net')
-        if net_val is not None:
-            net_dec = _convert_to_decimal(net_val, f"{log_row_context} Net")
-            if net_dec is not None:
-                current_sums['net_sum'] += net_dec
-        
-        # Track col_cbm_raw specifically
-        raw_cbm_val = row.get('col_cbm_raw')
-        if raw_cbm_val:
-            existing_raw = current_sums.get('col_cbm_raw')
-            if existing_raw:
-                current_sums['col_cbm_raw'] = f"{existing_raw} + {raw_cbm_val}"
-            else:
-                current_sums['col_cbm_raw'] = str(raw_cbm_val)
-
-        # Store the updated dictionary back into the global map
-        aggregated_results[key] = current_sums
+    # --- Add to the global aggregate sums (SQFT & Amount default to 0 if conversion fails/None) ---
+    rows_processed_this_table = len(row_keys)
+    successful_conversions_sqft, successful_conversions_amount = _add_grouped_sums(aggregated_results, row_keys, inputs)
 
     # --- Log summary for this table's contribution ---
     logging.info(f"{prefix} Finished processing {rows_processed_this_table} rows for this table.")
@@ -900,6 +1199,52 @@ def aggregate_custom_by_po_item(
     return aggregated_results
 
 
+def aggregate_standard_and_custom(
+    processed_data: List[Dict[str, Any]],
+    global_aggregation_map: Dict[Tuple[Any, Any, Optional[decimal.Decimal], Optional[str]], Dict[str, decimal.Decimal]],
+    global_custom_aggregation_map: Dict[Tuple[Any, Any, None, Optional[str]], Dict[str, decimal.Decimal]]
+) -> Tuple[Dict, Dict]:
+    """
+    Runs the STANDARD and CUSTOM aggregations over the same table in one go.
+    Equivalent to calling aggregate_standard_by_po_item_price and aggregate_custom_by_po_item,
+    but the PO/Item/Description keys and the SQFT/Amount/Net Decimal columns are only
+    built once for both maps.
+
+    Returns:
+        (global_aggregation_map, global_custom_aggregation_map), both updated in place.
+    """
+    inputs = _AggregationInputs(processed_data)
+    _aggregate_standard(inputs, global_aggregation_map)
+    _aggregate_custom(inputs, global_custom_aggregation_map)
+    return global_aggregation_map, global_custom_aggregation_map
+
+
+def _sum_decimal_values(values: List[Any]) -> decimal.Decimal:
+    """Sums the truthy values that convert to Decimal; anything else is skipped."""
+    converted = map(_convert_to_decimal, filter(None, values))
+    return sum([v for v in converted if v is not None], _DEC_ZERO)
+
+
+def _sum_int_values(values: List[Any]) -> int:
+    """Sums int(float(value)) of the truthy values; unparseable values are skipped."""
+    total = 0
+    for val in filter(None, values):
+        val_type = type(val)
+        # ints, floats and digit strings (the usual cell types) need no float() parse
+        if val_type is int:
+            total += val
+        elif val_type is float and val == val:
+            total += int(val)
+        elif val_type is str and val.isdecimal():
+            total += int(val)
+        else:
+            try:
+                total += int(float(val))
+            except (ValueError, TypeError):
+                pass
+    return total
+
+
 def calculate_leather_summary(processed_data: List[Dict[str, Any]]) -> Dict[str, Any]:
     """
     Calculates the leather summary (PCS, SQFT, Net, Gross, Pallet Count) per leather type.
@@ -909,56 +1254,76 @@ def calculate_leather_summary(processed_data: List[Dict[str, Any]]) -> Dict[str,
     """
     # Initialize summary structure with default 0s
     summary = {
-        'BUFFALO': {'col_qty_pcs': 0, 'col_qty_sf': decimal.Decimal(0), 'col_net': decimal.Decimal(0), 'col_gross': decimal.Decimal(0), 'col_cbm': decimal.Decimal(0), 'col_pallet_count': 0},
-        'COW': {'col_qty_pcs': 0, 'col_qty_sf': decimal.Decimal(0), 'col_net': decimal.Decimal(0), 'col_gross': decimal.Decimal(0), 'col_cbm': decimal.Decimal(0), 'col_pallet_count': 0}
+        'BUFFALO': {'col_qty_pcs': 0, 'col_qty_sf': _DEC_ZERO, 'col_net': _DEC_ZERO, 'col_gross': _DEC_ZERO, 'col_cbm': _DEC_ZERO, 'col_pallet_count': 0},
+        'COW': {'col_qty_pcs': 0, 'col_qty_sf': _DEC_ZERO, 'col_net': _DEC_ZERO, 'col_gross': _DEC_ZERO, 'col_cbm': _DEC_ZERO, 'col_pallet_count': 0}
     }
 
     if not processed_data:
         return summary
 
+    # Classify every row once, then reduce each leather type column by column
+    # BUFFALO = contains "BUFFALO", COW = everything else (non-buffalo leather)
+    buffalo_rows: List[Dict[str, Any]] = []
+    cow_rows: List[Dict[str, Any]] = []
+    add_buffalo, add_cow = buffalo_rows.append, cow_rows.append
+    # Descriptions repeat across rows: upper-case and search each distinct string once
+    buffalo_by_desc: Dict[str, bool] = {}
+    known_desc = buffalo_by_desc.get
     for row in processed_data:
-        desc = str(row.get('col_desc', "")).upper() if row.get('col_desc') else ""
-        
-        # BUFFALO = contains "BUFFALO", COW = everything else (non-buffalo leather)
-        leather_type = 'BUFFALO' if "BUFFALO" in desc else 'COW'
-        
-        # Sum PCS
-        try:
-            val = row.get('col_qty_pcs')
-            summary[leather_type]['col_qty_pcs'] += int(float(val)) if val else 0
-        except (ValueError, TypeError): pass
+        desc = row.get('col_desc')
+        if type(desc) is str:
+            is_buffalo = known_desc(desc)
+            if is_buffalo is None:
+                is_buffalo = buffalo_by_desc[desc] = "BUFFALO" in desc.upper()
+        else:
+            is_buffalo = bool(desc) and "BUFFALO" in str(desc).upper()
+        if is_buffalo:
+            add_buffalo(row)
+        else:
+            add_cow(row)
+    rows_by_type = {'BUFFALO': buffalo_rows, 'COW': cow_rows}
 
-        # Sum SQFT
-        try:
-            val = row.get('col_qty_sf')
-            summary[leather_type]['col_qty_sf'] += _convert_to_decimal(val) if val else decimal.Decimal(0)
-        except (ValueError, TypeError): pass
+    with decimal.localcontext(_DECIMAL_CONTEXT):
+        for leather_type, rows in rows_by_type.items():
+            if not rows:
+                continue
+            totals = summary[leather_type]
+            for col in ('col_qty_pcs', 'col_pallet_count'):
+                totals[col] = _sum_int_values([row.get(col) for row in rows])
+            for col in ('col_qty_sf', 'col_net', 'col_gross', 'col_cbm'):
+                totals[col] = _sum_decimal_values([row.get(col) for row in rows])
 
-        # Sum Net
-        try:
-            val = row.get('col_net')
-            summary[leather_type]['col_net'] += _convert_to_decimal(val) if val else decimal.Decimal(0)
-        except (ValueError, TypeError): pass
+    return summary
 
-        # Sum Gross
-        try:
-            val = row.get('col_gross')
-            summary[leather_type]['col_gross'] += _convert_to_decimal(val) if val else decimal.Decimal(0)
-        except (ValueError, TypeError): pass
 
-        # Sum CBM
-        try:
-            val = row.get('col_cbm')
-            summary[leather_type]['col_cbm'] += _convert_to_decimal(val) if val else decimal.Decimal(0)
-        except (ValueError, TypeError): pass
+def _int_sums_by_group(group_ids: List[int], values: List[Any], group_count: int) -> List[int]:
+    """Per-group sums of int(float(value)) in one pass over the column; unparseable values are skipped."""
+    totals = [0] * group_count
+    for group, val in zip(group_ids, values):
+        if not val:
+            continue
+        val_type = type(val)
+        if val_type is int:
+            totals[group] += val
+        elif val_type is float and val == val:
+            totals[group] += int(val)
+        elif val_type is str and val.isdecimal():
+            totals[group] += int(val)
+        else:
+            try:
+                totals[group] += int(float(val))
+            except (ValueError, TypeError):
+                pass
+    return totals
 
-        # Sum Pallet Count (if available per row)
-        try:
-            val = row.get('col_pallet_count')
-            summary[leather_type]['col_pallet_count'] += int(float(val)) if val else 0
-        except (ValueError, TypeError): pass
 
-    return summary
+def _decimal_sums_by_group(group_ids: List[int], values: List[Optional[decimal.Decimal]], group_count: int) -> List[decimal.Decimal]:
+    """Per-group sums of the non-zero converted values in one pass over the column, in row order."""
+    totals = [_DEC_ZERO] * group_count
+    for group, val in zip(group_ids, values):
+        if val:
+            totals[group] += val
+    return totals
 
 
 def aggregate_per_po_with_pallets(processed_data: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
@@ -966,6 +1331,9 @@ def aggregate_per_po_with_pallets(processed_data: List[Dict[str, Any]]) -> List[
     Aggregates data by PO and Item, summing pallet, pcs, sqft, amount, net, gross, cbm.
     Groups rows that share the same (PO, Item) combination.
 
+    Every row gets a dense group id first; each column is then converted once and reduced
+    in a single pass into per-group totals, so no per-row dict lookups are left in the sums.
+
     Args:
         processed_data: List of row dicts with col_* keys.
 
@@ -975,124 +1343,86 @@ def aggregate_per_po_with_pallets(processed_data: List[Dict[str, Any]]) -> List[
     if not isinstance(processed_data, list) or not processed_data:
         return []
 
-    aggregation_map = {}
-
+    # --- Dense group id per (PO, Item), in first-seen order; rows without a PO are skipped ---
+    rows: List[Dict[str, Any]] = []
+    group_ids: List[int] = []
+    group_by_key: Dict[Tuple[str, str], int] = {}
     for row in processed_data:
-        # --- Validate PO ---
         po_val = row.get('col_po')
         if po_val is None:
             continue
         po = str(po_val).strip()
         if not po:
             continue
-
-        # --- Validate Item ---
         item_val = row.get('col_item')
         item = str(item_val).strip() if item_val is not None else ""
 
         key = (po, item)
-
-        if key not in aggregation_map:
-            aggregation_map[key] = {
-                'col_desc': '',
-                'col_qty_pcs': 0,
-                'col_qty_sf': decimal.Decimal(0),
-                'col_amount': decimal.Decimal(0),
-                'col_pallet_count': 0,
-                'col_net': decimal.Decimal(0),
-                'col_gross': decimal.Decimal(0),
-                'col_cbm': decimal.Decimal(0),
-                'col_cbm_raw': ''
-            }
-
+        group = group_by_key.get(key)
+        if group is None:
+            group = group_by_key[key] = len(group_by_key)
+        group_ids.append(group)
+        rows.append(row)
+
+    group_count = len(group_by_key)
+    descs = [''] * group_count
+    cbm_raws = [''] * group_count
+    for group, row in zip(group_ids, rows):
         # Capture description from first row (all rows in same PO+Item group share desc)
-        if not aggregation_map[key]['col_desc']:
+        if not descs[group]:
             desc_val = row.get('col_desc')
             if desc_val:
-                aggregation_map[key]['col_desc'] = str(desc_val).strip()
+                descs[group] = str(desc_val).strip()
 
         # Concatenate col_cbm_raw strings
         cbm_raw_val = row.get('col_cbm_raw')
         if cbm_raw_val:
             cbm_raw_str = str(cbm_raw_val).strip()
             if cbm_raw_str:
-                existing_raw = aggregation_map[key]['col_cbm_raw']
-                if existing_raw:
-                    # Avoid duplicating the same formula "1.2*0.8*1 + 1.2*0.8*1" if they are identical
-                    # But for now, we just join them to show what was aggregated
-                    if cbm_raw_str not in str(existing_raw).split(" + "):
-                        aggregation_map[key]['col_cbm_raw'] = str(aggregation_map[key]['col_cbm_raw']) + f" + {cbm_raw_str}"
-                else:
-                    aggregation_map[key]['col_cbm_raw'] = cbm_raw_str
-
-        # Sum sqft
-        sqft_val = row.get('col_qty_sf')
-        if sqft_val is not None:
-             converted = _convert_to_decimal(sqft_val)
-             if converted:
-                 aggregation_map[key]['col_qty_sf'] += converted
-
-        # Sum amount
-        amount_val = row.get('col_amount')
-        if amount_val is not None:
-             converted = _convert_to_decimal(amount_val)
-             if converted:
-                 aggregation_map[key]['col_amount'] += converted
-
-        # Sum pallet_count — values are always 1/0 integers after normalize_pallet_count
-        pallet_val = row.get('col_pallet_count')
-        if pallet_val is not None:
-             try:
-                 aggregation_map[key]['col_pallet_count'] += int(float(pallet_val))
-             except (ValueError, TypeError): pass
-
-        # Sum net
-        net_val = row.get('col_net')
-        if net_val is not None:
-             converted = _convert_to_decimal(net_val)
-             if converted:
-                 aggregation_map[key]['col_net'] += converted
-
-        # Sum gross
-        gross_val = row.get('col_gross')
-        if gross_val is not None:
-             converted = _convert_to_decimal(gross_val)
-             if converted:
-                 aggregation_map[key]['col_gross'] += converted
-
-        # Sum cbm
-        cbm_val = row.get('col_cbm')
-        if cbm_val is not None:
-             converted = _convert_to_decimal(cbm_val)
-             if converted:
-                 aggregation_map[key]['col_cbm'] += converted
-
-        # Sum pcs
-        pcs_val = row.get('col_qty_pcs')
-        if pcs_val is not None:
-             try:
-                 aggregation_map[key]['col_qty_pcs'] += int(float(pcs_val))
-             except (ValueError, TypeError): pass
-
-    # Convert to list of dicts
-    result = []
-    for (po, item), data in aggregation_map.items():
-        result.append({
+                existing_raw = cbm_raws[group]
+                if not existing_raw:
+                    cbm_raws[group] = cbm_raw_str
+                # Avoid duplicating the same formula "1.2*0.8*1 + 1.2*0.8*1" if they are identical
+                elif cbm_raw_str not in existing_raw.split(" + "):
+                    cbm_raws[group] = f"{existing_raw} + {cbm_raw_str}"
+
+    # --- Column reductions; failed conversions and zeros are not added ---
+    # Columns no row carries keep their zero totals without a pass over the rows
+    decimal_cols = ('col_qty_sf', 'col_amount', 'col_net', 'col_gross', 'col_cbm')
+    int_cols = ('col_qty_pcs', 'col_pallet_count')
+    present_cols = _columns_present(rows, list(decimal_cols + int_cols))
+    sums = {}
+    with decimal.localcontext(_DECIMAL_CONTEXT):
+        for col in decimal_cols:
+            if col not in present_cols:
+                sums[col] = [_DEC_ZERO] * group_count
+                continue
+            values = _convert_column([row.get(col) for row in rows], f"[aggregate_per_po] {col}")
+            sums[col] = _decimal_sums_by_group(group_ids, values, group_count)
+    # Pallet values are always 1/0 integers after normalize_pallet_count
+    for col in int_cols:
+        if col not in present_cols:
+            sums[col] = [0] * group_count
+            continue
+        sums[col] = _int_sums_by_group(group_ids, [row.get(col) for row in rows], group_count)
+
+    # Build the records sorted by PO, then by Item for consistent output (keys are unique)
+    result = [
+        {
             'col_po': po,
             'col_item': item,
-            'col_desc': data['col_desc'],
-            'col_qty_pcs': data['col_qty_pcs'],
-            'col_qty_sf': data['col_qty_sf'],
-            'col_amount': data['col_amount'],
-            'col_pallet_count': data['col_pallet_count'],
-            'col_net': data['col_net'],
-            'col_gross': data['col_gross'],
-            'col_cbm': data['col_cbm'],
-            'col_cbm_raw': data['col_cbm_raw']
-        })
-
-    # Sort by PO, then by Item for consistent output
-    result.sort(key=lambda x: (x['col_po'], x['col_item']))
+            'col_desc': descs[group],
+            'col_qty_pcs': sums['col_qty_pcs'][group],
+            'col_qty_sf': sums['col_qty_sf'][group],
+            'col_amount': sums['col_amount'][group],
+            'col_pallet_count': sums['col_pallet_count'][group],
+            'col_net': sums['col_net'][group],
+            'col_gross': sums['col_gross'][group],
+            'col_cbm': sums['col_cbm'][group],
+            'col_cbm_raw': cbm_raws[group]
+        }
+        for (po, item), group in sorted(group_by_key.items(), key=itemgetter(0))
+    ]
 
     logging.info(f"[aggregate_per_po_with_pallets] Aggregated {len(processed_data)} rows into {len(result)} unique PO+Item combinations.")
 
@@ -1109,20 +1439,16 @@ def calculate_weight_summary(processed_data: List[Dict[str, Any]]) -> Dict[str,
     Returns:
         Dictionary containing 'net' and 'gross' weights.
     """
-    summary = {'col_net': decimal.Decimal(0), 'col_gross': decimal.Decimal(0)}
+    summary = {'col_net': _DEC_ZERO, 'col_gross': _DEC_ZERO}
     
     if not processed_data:
         return summary
         
-    for row in processed_data:
-        net_val = _convert_to_decimal(row.get('col_net'))
-        if net_val is not None:
-             summary['col_net'] += net_val
-             
-        gross_val = _convert_to_decimal(row.get('col_gross'))
-        if gross_val is not None:
-             summary['col_gross'] += gross_val
-             
+    # One builtin sum() per column over the converted values (zeros still count: they keep the exponent)
+    with decimal.localcontext(_DECIMAL_CONTEXT):
+        for col in ('col_net', 'col_gross'):
+            converted = map(_convert_to_decimal, [row.get(col) for row in processed_data])
+            summary[col] = sum([v for v in converted if v is not None], _DEC_ZERO)
     return summary
 
 def calculate_pallet_summary(processed_data: List[Dict[str, Any]]) -> int:
@@ -1135,20 +1461,52 @@ def calculate_pallet_summary(processed_data: List[Dict[str, Any]]) -> int:
     Returns:
         Total pallet count as integer.
     """
-    total_pallets = 0
-    
     if not processed_data:
         return 0
-        
-    for row in processed_data:
-        val = row.get('col_pallet_count')
-        if val is not None:
-            try:
-                total_pallets += int(float(val))
-            except (ValueError, TypeError):
-                pass
-                
-    return total_pallets
+
+    return _sum_int_values([row.get('col_pallet_count') for row in processed_data])
+
+def _footer_decimal(value: Any) -> Optional[decimal.Decimal]:
+    """Footer cell -> Decimal (thousands separators removed); None when missing or unparseable."""
+    # Exact type checks: numeric cells skip the str() + replace() round-trip (bool is not int here)
+    value_type = type(value)
+    if value_type is decimal.Decimal:
+        return value
+    if value_type is int:
+        return decimal.Decimal(value)
+    if value is None:
+        return None
+    if value_type is float:
+        return decimal.Decimal(repr(value))
+    value_str = str(value)
+    if ',' in value_str:
+        value_str = value_str.replace(',', '')
+    try:
+        return decimal.Decimal(value_str)
+    except (decimal.InvalidOperation, ValueError, TypeError):
+        return None
+
+
+def _footer_int(value: Any) -> int:
+    """Footer cell -> int(float(value)) (thousands separators removed); 0 when missing or unparseable."""
+    if value is None:
+        return 0
+    value_type = type(value)
+    try:
+        if value_type is int:
+            return value
+        if value_type is float:
+            return int(value)
+        # Plain digit strings parse directly; signs, decimals and separators go through float()
+        if value_type is str and value.isdecimal():
+            return int(value)
+        value_str = str(value)
+        if ',' in value_str:
+            value_str = value_str.replace(',', '')
+        return int(float(value_str))
+    except (ValueError, TypeError):
+        return 0
+
 
 def calculate_footer_totals(processed_data: List[Dict[str, Any]]) -> Dict[str, Any]:
     """
@@ -1157,44 +1515,79 @@ def calculate_footer_totals(processed_data: List[Dict[str, Any]]) -> Dict[str, A
     """
     totals = {
         "col_qty_pcs": 0,
-        "col_qty_sf": decimal.Decimal(0),
-        "col_net": decimal.Decimal(0),
-        "col_gross": decimal.Decimal(0),
-        "col_cbm": decimal.Decimal(0),
-        "col_amount": decimal.Decimal(0),
+        "col_qty_sf": _DEC_ZERO,
+        "col_net": _DEC_ZERO,
+        "col_gross": _DEC_ZERO,
+        "col_cbm": _DEC_ZERO,
+        "col_amount": _DEC_ZERO,
         "col_pallet_count": 0
     }
     
     if not processed_data:
         return totals
 
-    def safe_add_decimal(key, value):
-        if value is not None:
-            try:
-                val_str = str(value).replace(',', '')
-                totals[key] += decimal.Decimal(val_str)
-            except (decimal.InvalidOperation, ValueError, TypeError):
-                pass
+    # Sum row by row into locals; totals is written once at the end
+    qty_pcs = pallet_count = 0
+    qty_sf = net = gross = cbm = amount = _DEC_ZERO
+    with decimal.localcontext(_DECIMAL_CONTEXT):
+        for row in processed_data:
+            get = row.get
+            qty_pcs += _footer_int(get('col_qty_pcs'))
+            value = _footer_decimal(get('col_qty_sf'))
+            if value is not None:
+                qty_sf += value
+            value = _footer_decimal(get('col_net'))
+            if value is not None:
+                net += value
+            value = _footer_decimal(get('col_gross'))
+            if value is not None:
+                gross += value
+            value = _footer_decimal(get('col_cbm'))
+            if value is not None:
+                cbm += value
+            value = _footer_decimal(get('col_amount'))
+            if value is not None:
+                amount += value
+            pallet_count += _footer_int(get('col_pallet_count'))
+
+    totals.update({
+        "col_qty_pcs": qty_pcs,
+        "col_qty_sf": qty_sf,
+        "col_net": net,
+        "col_gross": gross,
+        "col_cbm": cbm,
+        "col_amount": amount,
+        "col_pallet_count": pallet_count
+    })
+    return totals
 
-    def safe_add_int(key, value):
-        if value is not None:
-            try:
-                val_str = str(value).replace(',', '')
-                totals[key] += int(float(val_str))
-            except (ValueError, TypeError):
-                pass
 
-    # Sum row by row
-    for row in processed_data:
-        safe_add_int('col_qty_pcs', row.get('col_qty_pcs'))
-        safe_add_decimal('col_qty_sf', row.get('col_qty_sf'))
-        safe_add_decimal('col_net', row.get('col_net'))
-        safe_add_decimal('col_gross', row.get('col_gross'))
-        safe_add_decimal('col_cbm', row.get('col_cbm'))
-        safe_add_decimal('col_amount', row.get('col_amount'))
-        safe_add_int('col_pallet_count', row.get('col_pallet_count'))
+def _standard_key_fields(key_tuple: Tuple) -> Dict[str, str]:
+    """Key: (PO, Item, Price, Desc) -> col_po, col_item, col_unit_price, col_desc."""
+    po, item, price, desc = key_tuple[0], key_tuple[1], key_tuple[2], key_tuple[3]
+    return {
+        'col_po': "" if po is None else str(po),
+        'col_item': "" if item is None else str(item),
+        'col_unit_price': "" if price is None else str(price),
+        'col_desc': "" if desc is None else str(desc)
+    }
 
-    return totals
+
+def _custom_key_fields(key_tuple: Tuple) -> Dict[str, str]:
+    """Key: (PO, Item, None, Desc) -> col_po, col_item, col_desc (index 2 is None/ignored)."""
+    po, item, desc = key_tuple[0], key_tuple[1], key_tuple[3]
+    return {
+        'col_po': "" if po is None else str(po),
+        'col_item': "" if item is None else str(item),
+        'col_desc': "" if desc is None else str(desc)
+    }
+
+
+# Row-dict builders for 4-part aggregation keys, per format_aggregation_as_list mode
+_KEY_FIELDS_BY_MODE = {
+    'standard': _standard_key_fields,
+    'custom': _custom_key_fields,
+}
 
 
 def format_aggregation_as_list(
@@ -1213,40 +1606,25 @@ def format_aggregation_as_list(
         A list of dictionaries, each representing an aggregated row.
     """
     flattened_list = []
-    
+    # Pick the key extractor once for the whole map instead of testing the mode per row
+    key_fields = _KEY_FIELDS_BY_MODE.get(mode)
+
     for key_tuple, values in aggregation_map.items():
-        row_dict = {}
-        
-        # Extract values from the tuple key based on mode
-        if mode == 'standard':
-            # Key: (PO, Item, Price, Desc)
-            # Mapping: Index 0->col_po, 1->col_item, 2->col_unit_price, 3->col_desc
-            if len(key_tuple) >= 4:
-                row_dict['col_po'] = str(key_tuple[0]) if key_tuple[0] is not None else ""
-                row_dict['col_item'] = str(key_tuple[1]) if key_tuple[1] is not None else ""
-                row_dict['col_unit_price'] = str(key_tuple[2]) if key_tuple[2] is not None else ""
-                row_dict['col_desc'] = str(key_tuple[3]) if key_tuple[3] is not None else ""
-            else:
-                # Fallback for unexpected key length
-                row_dict['col_po'] = str(key_tuple[0]) if len(key_tuple) > 0 else ""
-                row_dict['col_item'] = str(key_tuple[1]) if len(key_tuple) > 1 else ""
-                
-        elif mode == 'custom':
-            # Key: (PO, Item, None, Desc)
-            # Mapping: Index 0->col_po, 1->col_item, 3->col_desc (Index 2 is None/Ignored)
-            if len(key_tuple) >= 4:
-                row_dict['col_po'] = str(key_tuple[0]) if key_tuple[0] is not None else ""
-                row_dict['col_item'] = str(key_tuple[1]) if key_tuple[1] is not None else ""
-                row_dict['col_desc'] = str(key_tuple[3]) if key_tuple[3] is not None else ""
-            else:
-                 # Fallback
-                row_dict['col_po'] = str(key_tuple[0]) if len(key_tuple) > 0 else ""
-                row_dict['col_item'] = str(key_tuple[1]) if len(key_tuple) > 1 else ""
+        if key_fields is None:
+            row_dict = {}
+        elif len(key_tuple) >= 4:
+            row_dict = key_fields(key_tuple)
+        else:
+            # Fallback for unexpected key length
+            row_dict = {
+                'col_po': str(key_tuple[0]) if len(key_tuple) > 0 else "",
+                'col_item': str(key_tuple[1]) if len(key_tuple) > 1 else ""
+            }
 
         # Extract aggregated values
-        sqft_sum = values.get('sqft_sum', decimal.Decimal(0))
-        amount_sum = values.get('amount_sum', decimal.Decimal(0))
-        net_sum = values.get('net_sum', decimal.Decimal(0))
+        sqft_sum = values.get('sqft_sum', _DEC_ZERO)
+        amount_sum = values.get('amount_sum', _DEC_ZERO)
+        net_sum = values.get('net_sum', _DEC_ZERO)
         
         row_dict['col_qty_sf'] = float(sqft_sum) if isinstance(sqft_sum, decimal.Decimal) else sqft_sum
         row_dict['col_amount'] = float(amount_sum) if isinstance(amount_sum, decimal.Decimal) else amount_sum
@@ -3,10 +3,58 @@
 import openpyxl
 import os
 import logging # Using logging is better than print for info/errors
+from openpyxl.utils.cell import coordinate_to_tuple
 
 # Basic config moved to main.py, logger will inherit settings
 # logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
+class _ValueCell:
+    """Stand-in for an openpyxl cell when only its value is needed."""
+    __slots__ = ('value',)
+
+    def __init__(self, value):
+        self.value = value
+
+
+class BufferedSheet:
+    """
+    Cell values of a worksheet read once in read-only mode.
+    Read-only worksheets stream the sheet XML and re-parse it on every random
+    cell access; the parsers address cells by row/column (sheet.cell(...) and
+    sheet["A12"]), so the values are buffered row by row instead.
+    Supports title, max_row, max_column, cell(row=, column=) and sheet["A1"].
+
+    Not a drop-in copy of a full load: max_row/max_column only count cells that hold a
+    value, while a fully loaded Worksheet also counts formatting-only cells, so its
+    max_row can be larger. The parsers only use max_row as a scan bound, and rows
+    without values are skipped there either way.
+    """
+    def __init__(self, worksheet):
+        self.title = worksheet.title
+        # Declared dimensions can be missing or stale in files written by other tools
+        worksheet.reset_dimensions()
+        rows = [tuple(row) for row in worksheet.iter_rows(values_only=True)]
+        # Trailing rows without any value (formatting only) do not count towards max_row
+        while rows and all(value is None for value in rows[-1]):
+            rows.pop()
+        self._rows = rows
+        self.max_row = len(self._rows)
+        self.max_column = max((len(row) for row in self._rows), default=0)
+
+    def _value(self, row, column):
+        if 1 <= row <= self.max_row:
+            values = self._rows[row - 1]
+            if 1 <= column <= len(values):
+                return values[column - 1]
+        return None
+
+    def cell(self, row, column):
+        return _ValueCell(self._value(row, column))
+
+    def __getitem__(self, coordinate):
+        return _ValueCell(self._value(*coordinate_to_tuple(coordinate)))
+
+
 class ExcelHandler:
     """Handles loading and accessing data from Excel files using openpyxl."""
     def __init__(self, file_path_or_buffer):
@@ -25,20 +73,24 @@ class ExcelHandler:
         target_name = "in-memory buffer" if self.is_buffer else self.file_path
         logging.info(f"Initialized ExcelHandler for: {target_name}")
 
-    def load_sheet(self, sheet_name=None, data_only=True):
+    def load_sheet(self, sheet_name=None, data_only=True, read_only=False):
         """
         Loads the workbook and a specific sheet.
 
         Args:
             sheet_name (str, optional): Name of the sheet. Defaults to None (active sheet).
             data_only (bool, optional): Get cell values (True) or formulas (False). Defaults to True.
+            read_only (bool, optional): Stream the workbook without parsing styles and return a
+                BufferedSheet holding the cell values (the workbook is closed afterwards).
+                Much faster on large files. Defaults to False.
 
         Returns:
-            openpyxl.worksheet.worksheet.Worksheet: The loaded sheet object, or None on failure.
+            openpyxl.worksheet.worksheet.Worksheet (or BufferedSheet when read_only=True):
+            The loaded sheet object, or None on failure.
         """
         try:
-            logging.info(f"Attempting to load workbook '{self.file_path}' with data_only={data_only}")
-            self.workbook = openpyxl.load_workbook(self.file_path, data_only=data_only)
+            logging.info(f"Attempting to load workbook '{self.file_path}' with data_only={data_only}, read_only={read_only}")
+            self.workbook = openpyxl.load_workbook(self.file_path, data_only=data_only, read_only=read_only)
             active_sheet_title = self.workbook.active.title # Get active sheet title early
 
             if sheet_name:
@@ -52,7 +104,14 @@ class ExcelHandler:
                 self.sheet = self.workbook.active
                 logging.info(f"No sheet name specified. Successfully loaded active sheet: '{self.sheet.title}'")
 
-            logging.info(f"Sheet dimensions: Max Row={self.sheet.max_row}, Max Col={self.sheet.max_column}")
+            if read_only:
+                self.sheet = BufferedSheet(self.sheet)
+                # Read-only workbooks keep the file open until closed
+                self.workbook.close()
+
+            # In read-only mode these count value cells only (see BufferedSheet)
+            logging.info(f"Sheet dimensions: Max Row={self.sheet.max_row}, Max Col={self.sheet.max_column}"
+                         + (" (cells with values)" if read_only else ""))
             
             # Add diagnostic info for MOTO files
             if "MOTO" in str(self.file_path):
@@ -6,6 +6,7 @@ import pprint
 import re
 import decimal
 import os
+import sys
 import json # Added for JSON output
 import datetime # <<< ADDED IMPORT for datetime handling
 import argparse # <<< ADDED IMPORT for argument parsing
@@ -13,6 +14,7 @@ from pathlib import Path # <<< ADDED IMPORT for pathlib
 from typing import Dict, List, Any, Optional, Tuple, Union
 import time # Added for timing operations
 import copy # For deep-copying raw table data before processing mutates it
+from itertools import chain
 
 # --- Loop Profiler (non-invasive measurement) ---
 from core.utils.loop_profiler import loop_profiler
@@ -48,6 +50,9 @@ logger = logging.getLogger(__name__)
 # --- Constants for Log Truncation ---
 MAX_LOG_DICT_LEN = 3000 # Max length for printing large dicts in logs (for DEBUG)
 
+# Shared Decimal zero for the DAF accumulators (Decimals are immutable, so reuse is safe)
+_DEC_ZERO = decimal.Decimal(0)
+
 # --- Constants for DAF Compounding Formatting ---
 DAF_CHUNK_SIZE = 2  # How many items per group (e.g., PO1\\PO2)
 DAF_INTRA_CHUNK_SEPARATOR = "/"  # Separator within a group (e.g., DOUBLE BACKSLASH)
@@ -62,10 +67,38 @@ InitialAggregationResults = Union[
 # Type alias for the DAF compounding result structure
 DAFCompoundingResult = Dict[str, Union[str, decimal.Decimal]]
 
+# Empty DAF group; callers get a shallow copy (the values are immutable)
+_DEFAULT_DAF_GROUP: DAFCompoundingResult = {
+    'col_po': '',
+    'col_item': '',
+    'col_desc': '',
+    'col_qty_sf': _DEC_ZERO,
+    'col_amount': _DEC_ZERO
+}
+
 # Type alias for the final DAF result (ALWAYS a list of dicts now)
 FinalDAFResultType = List[DAFCompoundingResult]
 
 
+def _key_has_description(key: Any) -> bool:
+    """True when the aggregation key's 4th part (description) is non-empty; malformed keys count as no description."""
+    try:
+        return len(key) >= 4 and key[3] is not None and bool(str(key[3]).strip())
+    except (IndexError, TypeError):
+        return False
+
+
+class _POTotals:
+    """Running SQFT / Amount / Net totals and the item labels of one PO (DAF PO-count split)."""
+    __slots__ = ('sqft_total', 'amount_total', 'net_total', 'items')
+
+    def __init__(self):
+        self.sqft_total = _DEC_ZERO
+        self.amount_total = _DEC_ZERO
+        self.net_total = _DEC_ZERO
+        self.items = set()
+
+
 # *** DAF Compounding Function with Chunking ***
 def perform_DAF_compounding(
     initial_results: InitialAggregationResults, # Type hint updated
@@ -91,14 +124,7 @@ def perform_DAF_compounding(
     logging.info(f"{prefix} Starting DAF Compounding. Checking for descriptions to determine split type.")
 
     # Helper function for creating a default empty group result
-    def default_group_result() -> DAFCompoundingResult:
-        return {
-            'col_po': '',
-            'col_item': '',
-            'col_desc': '',
-            'col_qty_sf': decimal.Decimal(0),
-            'col_amount': decimal.Decimal(0)
-        }
+    default_group_result = _DEFAULT_DAF_GROUP.copy
 
     # Handle empty input consistently -> returns default BUFFALO split dict
     if not initial_results:
@@ -109,31 +135,15 @@ def perform_DAF_compounding(
         ]
 
     # --- Check if any description data exists ---
-    any_description_present = False
-    for key in initial_results.keys():
-        desc_key_val = None
-        try:
-            if aggregation_mode == 'standard' and len(key) == 4:
-                desc_key_val = key[3]
-            elif aggregation_mode == 'custom' and len(key) == 4:
-                desc_key_val = key[3]
-            elif len(key) >= 4: desc_key_val = key[3]
-            if desc_key_val is not None and str(desc_key_val).strip():
-                any_description_present = True
-                logging.debug(f"{prefix} Found description data. Will perform BUFFALO split.")
-                break
-        except (IndexError, TypeError): continue
+    # Description is the 4th key part in every mode; any() stops at the first key that has one
+    any_description_present = any(map(_key_has_description, initial_results))
+    if any_description_present:
+        logging.debug(f"{prefix} Found description data. Will perform BUFFALO split.")
 
     # Reusable helper function for formatting chunks
+    # Items are always the PO/Item/Description strings built below, so no str() per item
     def format_chunks(items: List[str], chunk_size: int, intra_sep: str, inter_sep: str) -> str:
-        if not items:
-            return ""
-        processed_chunks = []
-        for i in range(0, len(items), chunk_size):
-            chunk = [str(item) for item in items[i:i + chunk_size]]
-            joined_chunk = intra_sep.join(chunk)
-            processed_chunks.append(joined_chunk)
-        return inter_sep.join(processed_chunks)
+        return inter_sep.join(intra_sep.join(items[i:i + chunk_size]) for i in range(0, len(items), chunk_size))
 
     # --- Decide Execution Path --- #
 
@@ -156,12 +166,14 @@ def perform_DAF_compounding(
         non_buffalo_net = decimal.Decimal(0)
 
         logging.debug(f"{prefix} Processing {len(initial_results)} entries for BUFFALO split.")
+        # Standard (PO, Item, Price, Desc) and custom (PO, Item, None, Desc) keys unpack the same way;
+        # the mode is fixed for the call, so compare it once instead of per key
+        known_key_layout = aggregation_mode in ('standard', 'custom')
+        buffalo_by_desc: Dict[str, bool] = {}
         for key, sums_dict in initial_results.items():
              po_key_val, item_key_val, desc_key_val = None, None, None
              try: # Extract PO, Item, Desc
-                 if aggregation_mode == 'standard' and len(key) == 4:
-                     po_key_val, item_key_val, _, desc_key_val = key
-                 elif aggregation_mode == 'custom' and len(key) == 4:
+                 if known_key_layout and len(key) == 4:
                      po_key_val, item_key_val, _, desc_key_val = key
                  else:
                      if len(key) != 4: logging.warning(f"{prefix} Unexpected key length ({len(key)}) for key {key} in BUFFALO split mode. Trying heuristic.")
@@ -177,21 +189,24 @@ def perform_DAF_compounding(
              po_str = str(po_key_val) if po_key_val is not None else "<MISSING_PO>"
              item_str = str(item_key_val) if item_key_val is not None else "<MISSING_ITEM>"
              desc_str = str(desc_key_val).strip() if desc_key_val is not None else ""
-             is_buffalo = False
-             if desc_str and "BUFFALO" in desc_str.upper(): is_buffalo = True
+             # Descriptions repeat across keys: upper-case and search each distinct string once
+             is_buffalo = buffalo_by_desc.get(desc_str)
+             if is_buffalo is None:
+                 is_buffalo = buffalo_by_desc[desc_str] = bool(desc_str) and "BUFFALO" in desc_str.upper()
              
              # Use new col_ keys for sums
-             sqft_sum = sums_dict.get('col_qty_sf', decimal.Decimal(0))
-             amount_sum = sums_dict.get('col_amount', decimal.Decimal(0))
-             net_sum = sums_dict.get('net_sum', decimal.Decimal(0))
+             sqft_sum = sums_dict.get('col_qty_sf', _DEC_ZERO)
+             amount_sum = sums_dict.get('col_amount', _DEC_ZERO)
+             net_sum = sums_dict.get('net_sum', _DEC_ZERO)
              
-             # Fallback for legacy keys if not found (just in case)
-             if sqft_sum == 0 and 'sqft_sum' in sums_dict: sqft_sum = sums_dict.get('sqft_sum', decimal.Decimal(0))
-             if amount_sum == 0 and 'amount_sum' in sums_dict: amount_sum = sums_dict.get('amount_sum', decimal.Decimal(0))
+             # Fallback for legacy keys if not found (the aggregation maps use sqft_sum/amount_sum);
+             # get() with the current value as default replaces the separate 'in' probe
+             if sqft_sum == 0: sqft_sum = sums_dict.get('sqft_sum', sqft_sum)
+             if amount_sum == 0: amount_sum = sums_dict.get('amount_sum', amount_sum)
 
-             if not isinstance(sqft_sum, decimal.Decimal): sqft_sum = decimal.Decimal(0)
-             if not isinstance(amount_sum, decimal.Decimal): amount_sum = decimal.Decimal(0)
-             if not isinstance(net_sum, decimal.Decimal): net_sum = decimal.Decimal(0)
+             if not isinstance(sqft_sum, decimal.Decimal): sqft_sum = _DEC_ZERO
+             if not isinstance(amount_sum, decimal.Decimal): amount_sum = _DEC_ZERO
+             if not isinstance(net_sum, decimal.Decimal): net_sum = _DEC_ZERO
 
              if is_buffalo:
                  buffalo_pos.add(po_str)
@@ -211,8 +226,8 @@ def perform_DAF_compounding(
         logging.debug(f"{prefix} Finished processing entries for BUFFALO split.")
 
         # Format BUFFALO Group ("1")
-        sorted_buffalo_pos = sorted(list(buffalo_pos))
-        sorted_buffalo_items = sorted(list(buffalo_items))
+        sorted_buffalo_pos = sorted(buffalo_pos)
+        sorted_buffalo_items = sorted(buffalo_items)
         sorted_buffalo_descriptions = sorted([d for d in buffalo_descriptions if d])
         buffalo_result: DAFCompoundingResult = {
             'col_po': format_chunks(sorted_buffalo_pos, DAF_CHUNK_SIZE, DAF_INTRA_CHUNK_SEPARATOR, DAF_INTER_CHUNK_SEPARATOR),
@@ -223,8 +238,8 @@ def perform_DAF_compounding(
             'col_net': buffalo_net
         }
         # Format NON-BUFFALO Group ("2")
-        sorted_non_buffalo_pos = sorted(list(non_buffalo_pos))
-        sorted_non_buffalo_items = sorted(list(non_buffalo_items))
+        sorted_non_buffalo_pos = sorted(non_buffalo_pos)
+        sorted_non_buffalo_items = sorted(non_buffalo_items)
         sorted_non_buffalo_descriptions = sorted([d for d in non_buffalo_descriptions if d])
         non_buffalo_result: DAFCompoundingResult = {
             'col_po': format_chunks(sorted_non_buffalo_pos, DAF_CHUNK_SIZE, DAF_INTRA_CHUNK_SEPARATOR, DAF_INTER_CHUNK_SEPARATOR),
@@ -251,7 +266,7 @@ def perform_DAF_compounding(
         logging.info(f"{prefix}   - String formatting uses chunk size {DAF_CHUNK_SIZE} and separator '{DAF_INTRA_CHUNK_SEPARATOR}'.")
 
         # Step 1: Aggregate data by PO
-        po_data_aggregation: Dict[str, Dict[str, Union[set, decimal.Decimal]]] = {}
+        po_data_aggregation: Dict[str, _POTotals] = {}
         logging.debug(f"{prefix} Pass 1: Aggregating SQFT/Amount/Items per PO.")
         for key, sums_dict in initial_results.items():
              po_key_val, item_key_val = None, None
@@ -260,35 +275,38 @@ def perform_DAF_compounding(
                  else: continue
              except (TypeError, IndexError) as e: continue # Ignore errors in pass 1
 
-             po_str = str(po_key_val) if po_key_val is not None else "<MISSING_PO>"
-             item_str = str(item_key_val) if item_key_val is not None else "<MISSING_ITEM>"
+             # The same PO/Item labels repeat across many keys: intern them so the per-PO
+             # item sets (and the chunk unions built from them) share one object per label
+             po_str = sys.intern(str(po_key_val)) if po_key_val is not None else "<MISSING_PO>"
+             item_str = sys.intern(str(item_key_val)) if item_key_val is not None else "<MISSING_ITEM>"
              
              # Use new col_ keys
-             sqft_sum = sums_dict.get('col_qty_sf', decimal.Decimal(0))
-             amount_sum = sums_dict.get('col_amount', decimal.Decimal(0))
-             net_sum = sums_dict.get('net_sum', decimal.Decimal(0))
+             sqft_sum = sums_dict.get('col_qty_sf', _DEC_ZERO)
+             amount_sum = sums_dict.get('col_amount', _DEC_ZERO)
+             net_sum = sums_dict.get('net_sum', _DEC_ZERO)
              
              # Fallback
-             if sqft_sum == 0 and 'sqft_sum' in sums_dict: sqft_sum = sums_dict.get('sqft_sum', decimal.Decimal(0))
-             if amount_sum == 0 and 'amount_sum' in sums_dict: amount_sum = sums_dict.get('amount_sum', decimal.Decimal(0))
+             if sqft_sum == 0: sqft_sum = sums_dict.get('sqft_sum', sqft_sum)
+             if amount_sum == 0: amount_sum = sums_dict.get('amount_sum', amount_sum)
 
-             if not isinstance(sqft_sum, decimal.Decimal): sqft_sum = decimal.Decimal(0)
-             if not isinstance(amount_sum, decimal.Decimal): amount_sum = decimal.Decimal(0)
-             if not isinstance(net_sum, decimal.Decimal): net_sum = decimal.Decimal(0)
+             if not isinstance(sqft_sum, decimal.Decimal): sqft_sum = _DEC_ZERO
+             if not isinstance(amount_sum, decimal.Decimal): amount_sum = _DEC_ZERO
+             if not isinstance(net_sum, decimal.Decimal): net_sum = _DEC_ZERO
 
-             if po_str not in po_data_aggregation:
-                 po_data_aggregation[po_str] = {'sqft_total': decimal.Decimal(0), 'amount_total': decimal.Decimal(0), 'net_total': decimal.Decimal(0), 'items': set()}
-             po_data_aggregation[po_str]['sqft_total'] += sqft_sum # type: ignore
-             po_data_aggregation[po_str]['amount_total'] += amount_sum # type: ignore
-             po_data_aggregation[po_str]['net_total'] += net_sum # type: ignore
-             po_data_aggregation[po_str]['items'].add(item_str) # type: ignore
+             po_totals = po_data_aggregation.get(po_str)
+             if po_totals is None:
+                 po_totals = po_data_aggregation[po_str] = _POTotals()
+             po_totals.sqft_total += sqft_sum
+             po_totals.amount_total += amount_sum
+             po_totals.net_total += net_sum
+             po_totals.items.add(item_str)
 
         if not po_data_aggregation:
             logging.warning(f"{prefix} No valid PO data found for PO count splitting. Returning empty dict.")
             return {}
 
         # Step 2: Get sorted list of unique POs
-        sorted_pos = sorted(list(po_data_aggregation.keys()))
+        sorted_pos = sorted(po_data_aggregation)
 
         # Step 3: Iterate through POs in chunks based on >7 rule for total calculation
         final_po_count_split_result: FinalDAFResultType = []
@@ -317,16 +335,16 @@ def perform_DAF_compounding(
             for po_str in conceptual_po_chunk:
                 po_agg_data = po_data_aggregation.get(po_str)
                 if po_agg_data:
-                    chunk_sqft_total += po_agg_data.get('sqft_total', decimal.Decimal(0)) # type: ignore
-                    chunk_amount_total += po_agg_data.get('amount_total', decimal.Decimal(0)) # type: ignore
-                    chunk_net_total += po_agg_data.get('net_total', decimal.Decimal(0)) # type: ignore
-                    chunk_items.update(po_agg_data.get('items', set())) # type: ignore
+                    chunk_sqft_total += po_agg_data.sqft_total
+                    chunk_amount_total += po_agg_data.amount_total
+                    chunk_net_total += po_agg_data.net_total
+                    chunk_items.update(po_agg_data.items)
                     po_list_for_formatting.append(po_str) # Add the PO itself to the list for formatting
                 else:
                      logging.warning(f"{prefix} PO '{po_str}' not found in aggregation data during chunking.")
 
             # Sort items collected for this chunk
-            sorted_chunk_items = sorted(list(chunk_items))
+            sorted_chunk_items = sorted(chunk_items)
 
             # Step 4: Format the collected POs and Items using desired format (size 2)
             formatted_po_chunk = format_chunks(po_list_for_formatting, DAF_CHUNK_SIZE, DAF_INTRA_CHUNK_SEPARATOR, DAF_INTER_CHUNK_SEPARATOR)
@@ -382,6 +400,25 @@ def make_json_serializable(data):
     # Let the default handler in json.dumps deal with Decimal, datetime, etc.
     return data
 
+
+def dumps_output_json(data: Any) -> bytes:
+    """
+    Serializes the workbook output structure to pretty-printed (4-space indent) UTF-8 JSON
+    bytes, ready to be written to disk in one call.
+    Decimal, datetime and set values go through json_serializer_default.
+
+    The make_json_serializable walk over the whole structure is kept on purpose: stdlib
+    json cannot encode tuple keys and would write None/True keys as "null"/"true", so
+    every key is passed through str() first, as the output has always done.
+    """
+    return json.dumps(make_json_serializable(data), indent=4, default=json_serializer_default).encode('utf-8')
+
+
+def loads_output_json(raw: bytes) -> Any:
+    """Parses the JSON bytes written by dumps_output_json; raises json.JSONDecodeError on invalid input."""
+    return json.loads(raw)
+
+
 # <<< MODIFIED FUNCTION SIGNATURE >>>
 # Import PipelineMonitor
 
@@ -443,18 +480,20 @@ def run_invoice_automation(
                      monitor.log_process_item("Configuration", status="error", error=e)
                      raise RuntimeError("Input Excel file path is missing in config.")
 
-            if not os.path.isfile(input_filepath):
+            # Parse the path once; the checks below reuse the Path object
+            input_path = Path(input_filepath)
+            if not input_path.is_file():
                  # Try relative resolution
-                 script_dir = os.path.dirname(__file__)
-                 potential_path = os.path.join(script_dir, input_filepath)
-                 if os.path.isfile(potential_path):
-                     input_filepath = potential_path
+                 potential_path = Path(__file__).parent / input_path
+                 if potential_path.is_file():
+                     input_path = potential_path
+                     input_filepath = str(potential_path)
                      logging.info(f"Resolved relative input path: {input_filepath}")
                  else:
                      err = FileNotFoundError(f"Input Excel file not found: {input_filepath}")
                      monitor.log_process_item("Input File Check", status="error", error=err)
                      raise err
-            input_filename = os.path.basename(input_filepath)
+            input_filename = input_path.name
         else:
             input_filename = input_name
 
@@ -478,12 +517,13 @@ def run_invoice_automation(
             custom_prefixes = getattr(cfg, 'CUSTOM_AGGREGATION_WORKBOOK_PREFIXES', [])
             if not isinstance(custom_prefixes, list): custom_prefixes = []
             
-            for prefix in custom_prefixes:
-                 if input_filename.startswith(prefix):
-                    use_custom_aggregation_for_DAF = True
-                    aggregation_mode_used = "custom"
-                    logging.info(f"Using CUSTOM aggregation (Prefix: {prefix})")
-                    break
+            # str.startswith takes a tuple: one C-level check for all prefixes
+            prefixes_tuple = tuple(custom_prefixes)
+            if prefixes_tuple and input_filename.startswith(prefixes_tuple):
+                use_custom_aggregation_for_DAF = True
+                aggregation_mode_used = "custom"
+                matched_prefix = next(p for p in prefixes_tuple if input_filename.startswith(p))
+                logging.info(f"Using CUSTOM aggregation (Prefix: {matched_prefix})")
         except Exception as e:
             logging.error(f"Strategy determination error: {e}")
             monitor.log_warning(f"Aggregation strategy check failed: {e}")
@@ -493,7 +533,7 @@ def run_invoice_automation(
         try:
             logging.info(f"Loading workbook from: {input_filepath}")
             handler = ExcelHandler(input_filepath)
-            sheet = handler.load_sheet(sheet_name=cfg.SHEET_NAME, data_only=True)
+            sheet = handler.load_sheet(sheet_name=cfg.SHEET_NAME, data_only=True, read_only=True)
             if sheet is None: raise RuntimeError(f"Failed to load sheet from '{input_filepath}'.")
             
             actual_sheet_name = sheet.title
@@ -589,8 +629,7 @@ def run_invoice_automation(
                     
                     # 5c. Initial Aggregation
                     if data_for_aggregation:
-                         data_processor.aggregate_standard_by_po_item_price(data_for_aggregation, global_standard_aggregation_results)
-                         data_processor.aggregate_custom_by_po_item(data_for_aggregation, global_custom_aggregation_results)
+                         data_processor.aggregate_standard_and_custom(data_for_aggregation, global_standard_aggregation_results, global_custom_aggregation_results)
                     
                     monitor.log_process_item(table_id_str, status="success")
                 except DataValidationError as ve:
@@ -624,26 +663,28 @@ def run_invoice_automation(
 
 
         # --- 7. Output / Further Steps ---
-        logging.info(f"Final processed data structure contains {len(processed_tables)} table(s).")
-        logging.info(f"Primary aggregation mode used for DAF Compounding: {aggregation_mode_used.upper()}")
+        logging.info("Final processed data structure contains %d table(s).", len(processed_tables))
+        logging.info("Primary aggregation mode used for DAF Compounding: %s", aggregation_mode_used.upper())
 
-        # Log Standard Results
-        log_str_std = pprint.pformat(global_standard_aggregation_results)
-        if len(log_str_std) > MAX_LOG_DICT_LEN: log_str_std = log_str_std[:MAX_LOG_DICT_LEN] + "\n... (output truncated)"
-        logging.debug(f"--- Full Global STANDARD Aggregation Results ---\n{log_str_std}")
-        # Log Custom Results
-        log_str_cust = pprint.pformat(global_custom_aggregation_results)
-        if len(log_str_cust) > MAX_LOG_DICT_LEN: log_str_cust = log_str_cust[:MAX_LOG_DICT_LEN] + "\n... (output truncated)"
-        logging.debug(f"--- Full Global CUSTOM Aggregation Results ---\n{log_str_cust}")
+        # pformat walks the whole aggregation maps: only build the dumps when DEBUG is emitted
+        if logging.getLogger().isEnabledFor(logging.DEBUG):
+            # Log Standard Results
+            log_str_std = pprint.pformat(global_standard_aggregation_results)
+            if len(log_str_std) > MAX_LOG_DICT_LEN: log_str_std = log_str_std[:MAX_LOG_DICT_LEN] + "\n... (output truncated)"
+            logging.debug(f"--- Full Global STANDARD Aggregation Results ---\n{log_str_std}")
+            # Log Custom Results
+            log_str_cust = pprint.pformat(global_custom_aggregation_results)
+            if len(log_str_cust) > MAX_LOG_DICT_LEN: log_str_cust = log_str_cust[:MAX_LOG_DICT_LEN] + "\n... (output truncated)"
+            logging.debug(f"--- Full Global CUSTOM Aggregation Results ---\n{log_str_cust}")
 
 
         # --- Log Final DAF Compounded Result (INFO Level) - Simplified to expect split result --- #
-        logging.info(f"--- Final DAF Compounded Result (Workbook: '{input_filename}', Based on '{aggregation_mode_used.upper()}' Input) ---")
+        logging.info("--- Final DAF Compounded Result (Workbook: '%s', Based on '%s' Input) ---", input_filename, aggregation_mode_used.upper())
         if global_DAF_compounded_result is not None and isinstance(global_DAF_compounded_result, list):
             # Assume it's the BUFFALO split result or PO split result
-            logging.info(f"DAF result is a list with {len(global_DAF_compounded_result)} groups.")
+            logging.info("DAF result is a list with %d groups.", len(global_DAF_compounded_result))
             for chunk_index, chunk_data in enumerate(global_DAF_compounded_result):
-                logging.info(f"--- DAF Group {chunk_index + 1} --- ")
+                logging.info("--- DAF Group %d --- ", chunk_index + 1)
                 if chunk_data and isinstance(chunk_data, dict):
                     po_string_value = chunk_data.get('col_po', '<Not Found>')
                     item_string_value = chunk_data.get('col_item', '<Not Found>')
@@ -651,20 +692,20 @@ def run_invoice_automation(
                     total_sqft_value = chunk_data.get('col_qty_sf', 'N/A')
                     total_amount_value = chunk_data.get('col_amount', 'N/A')
 
-                    logging.info(f"  Combined POs:\n{po_string_value}")
-                    logging.info(f"  Combined Items:\n{item_string_value}")
-                    logging.info(f"  Combined Descriptions:\n{desc_string_value}")
-                    logging.info(f"  Total SQFT: {total_sqft_value} (Type: {type(total_sqft_value)})")
-                    logging.info(f"  Total Amount: {total_amount_value} (Type: {type(total_amount_value)})")
+                    logging.info("  Combined POs:\n%s", po_string_value)
+                    logging.info("  Combined Items:\n%s", item_string_value)
+                    logging.info("  Combined Descriptions:\n%s", desc_string_value)
+                    logging.info("  Total SQFT: %s (Type: %s)", total_sqft_value, type(total_sqft_value))
+                    logging.info("  Total Amount: %s (Type: %s)", total_amount_value, type(total_amount_value))
                 else:
-                    logging.info(f"  Group {chunk_index + 1} data not found or invalid.")
+                    logging.info("  Group %d data not found or invalid.", chunk_index + 1)
             logging.info("-" * 30)
 
         elif global_DAF_compounded_result is None:
             logging.error("DAF Compounding result is None or was not set.")
         else:
             # Handle unexpected type if necessary (e.g., empty dict if input was empty and aggregation failed)
-             logging.warning(f"DAF Compounding result has unexpected structure/type: {type(global_DAF_compounded_result)}")
+             logging.warning("DAF Compounding result has unexpected structure/type: %s", type(global_DAF_compounded_result))
 
         # --- End Final Logging ---
 
@@ -672,15 +713,15 @@ def run_invoice_automation(
         logging.info("--- Calculating Add-on Data ---")
         
         # Calculate grand total (merged across all tables)
-        merged_processed_data: List[Dict[str, Any]] = []
-        for table_data in processed_tables:
-            if isinstance(table_data, list):
-                merged_processed_data.extend(table_data)
+        # One C-level concatenation of all table row lists
+        merged_processed_data: List[Dict[str, Any]] = list(chain.from_iterable(
+            table_data for table_data in processed_tables if isinstance(table_data, list)
+        ))
 
         # Calculate normal aggregate per PO with pallets (group by PO + price)
         # We calculate this FIRST so we can use its accurate pallet count for the footer
         normal_aggregate_per_po = data_processor.aggregate_per_po_with_pallets(merged_processed_data)
-        logging.info(f"Normal Aggregate Per PO: {len(normal_aggregate_per_po)} unique PO+price combinations")
+        logging.info("Normal Aggregate Per PO: %d unique PO+price combinations", len(normal_aggregate_per_po))
 
         # Extract the true total pallets from the aggregated manifest
         true_total_pallets = sum(item.get('col_pallet_count', 0) for item in normal_aggregate_per_po)
@@ -688,7 +729,7 @@ def run_invoice_automation(
         # Calculate leather summary (BUFFALO vs COW) across all tables
         # Use the normal_aggregate_per_po data so we get integer pallet counts and correct sums
         leather_summary = data_processor.calculate_leather_summary(normal_aggregate_per_po)
-        logging.info(f"Leather Summary: {leather_summary}")
+        logging.info("Leather Summary: %s", leather_summary)
 
         # --- Calculate Footer Data ---
         logging.info("--- Calculating Footer Data ---")
@@ -704,7 +745,7 @@ def run_invoice_automation(
                 # but for now we'll rely on the parser to not double count. (Will be fixed in data_processor.py)
                 
                 table_footer_data.append(footer_totals)
-                logging.info(f"Table {table_id} Footer: {footer_totals}")
+                logging.info("Table %s Footer: %s", table_id, footer_totals)
         
         # Calculate grand total (merged across all tables)
         grand_total_footer = data_processor.calculate_footer_totals(merged_processed_data)
@@ -716,24 +757,23 @@ def run_invoice_automation(
         if len(table_footer_data) == 1:
             table_footer_data[0]['col_pallet_count'] = true_total_pallets
 
-        logging.info(f"Grand Total Footer: {grand_total_footer}")
+        logging.info("Grand Total Footer: %s", grand_total_footer)
 
         # Pallet values are already normalized to 1/0 by normalize_pallet_count().
         # The x-y display format (e.g. "3-19") is NOT produced here.
         # It will be reconstructed downstream in the invoice generator UI.
         for table_index, table_data in enumerate(processed_tables):
             if isinstance(table_data, list):
-                pallet_sum = sum(
-                    row.get('col_pallet_count', 0) for row in table_data
-                    if isinstance(row.get('col_pallet_count'), (int, float))
-                )
-                logging.info(f"Table {table_index + 1}: {pallet_sum} pallet boundaries (1/0 format)")
+                # One lookup per row; non-numeric leftovers are not counted
+                pallet_values = [row.get('col_pallet_count') for row in table_data]
+                pallet_sum = sum([value for value in pallet_values if isinstance(value, (int, float))])
+                logging.info("Table %d: %s pallet boundaries (1/0 format)", table_index + 1, pallet_sum)
 
         # --- 8. Generate JSON Output ---
         logging.info("--- Preparing Data for JSON Output ---")
         try:
             # Create the structure to be converted to JSON
-            # Use the helper function to ensure serializability
+            # Tuple keys, Decimal, datetime and sets are handled by dumps_output_json
             final_json_structure = {
                  "metadata": {
                     "workbook_filename": input_filename, # Use the actual input filename
@@ -748,19 +788,19 @@ def run_invoice_automation(
                 "price_adjustment": [], # Initialized for frontend adjustments
                  # Include processed table data (potentially large)
                  # RENAME: processed_tables_data -> multi_table
-                 "multi_table": make_json_serializable(processed_tables),
+                 "multi_table": processed_tables,
 
                  # Raw/unprocessed table data exactly as extracted from Excel.
                  # CBM and other values are NEVER distributed here.
                  # Kept purely for shipping list record-keeping; never used by invoice generation.
-                 "raw_data": make_json_serializable(raw_tables_snapshot),
+                 "raw_data": raw_tables_snapshot,
                  
                  # Include Footer Data - both per-table and grand total
                  "footer_data": {
-                     "table_totals": make_json_serializable(table_footer_data),  # Per-table totals
-                     "grand_total": make_json_serializable(grand_total_footer),   # Overall grand total
+                     "table_totals": table_footer_data,  # Per-table totals
+                     "grand_total": grand_total_footer,   # Overall grand total
                      "add_ons": {
-                         "leather_summary_addon": make_json_serializable(leather_summary),  # BUFFALO vs COW summary
+                         "leather_summary_addon": leather_summary,  # BUFFALO vs COW summary
                      }
                  },
 
@@ -774,34 +814,35 @@ def run_invoice_automation(
                     
                     # Normal aggregate per PO with pallets (group by PO + price)
                     # RENAME: normal_aggregate_per_po_with_pallets -> manifest_by_pallet_per_po (User Request)
-                    "manifest_by_pallet_per_po": make_json_serializable(normal_aggregate_per_po),
+                    "manifest_by_pallet_per_po": normal_aggregate_per_po,
 
                     # Include the final compounded result (derived from one of the above, based on mode)
                     # RENAME: final_DAF_compounded_result -> aggregation_DAF (Matches Suffix Rule)
-                    "aggregation_DAF": make_json_serializable(global_DAF_compounded_result)
+                    "aggregation_DAF": global_DAF_compounded_result
                 }
             }
 
              # Convert the structure to a JSON string (pretty-printed)
-            json_output_string = json.dumps(final_json_structure,
-                                            indent=4,
-                                            default=json_serializer_default) # Use the default serializer
+            json_output_bytes = dumps_output_json(final_json_structure) # Decimal/datetime/set via json_serializer_default
 
             # Log the JSON output (or a preview if too large)
-            logging.info("--- Generated JSON Output ---")
-            max_log_json_len = 5000
-            if len(json_output_string) <= max_log_json_len:
-                logging.info(json_output_string)
-            else:
-                logging.info(f"JSON output is large ({len(json_output_string)} chars). Logging preview:")
-                logging.info(json_output_string[:max_log_json_len] + "\n... (JSON output truncated in log)")
+            # Decoding the preview is only worth it when INFO records are emitted
+            if logging.getLogger().isEnabledFor(logging.INFO):
+                logging.info("--- Generated JSON Output ---")
+                max_log_json_len = 5000
+                if len(json_output_bytes) <= max_log_json_len:
+                    logging.info("%s", json_output_bytes.decode('utf-8'))
+                else:
+                    logging.info("JSON output is large (%d bytes). Logging preview:", len(json_output_bytes))
+                    # A cut inside a multi-byte character is dropped from the preview
+                    logging.info("%s\n... (JSON output truncated in log)", json_output_bytes[:max_log_json_len].decode('utf-8', errors='ignore'))
 
             # --- MODIFIED: Save JSON using output_dir and simplified filename ---
             input_stem = Path(input_filename).stem # Get filename without extension
             json_output_filename = f"{input_stem}.json" # Simplified filename
             output_json_path = output_dir / json_output_filename # Combine output dir and filename
 
-            logging.info(f"Determined output JSON path: {output_json_path}")
+            logging.info("Determined output JSON path: %s", output_json_path)
             try:
                 # --- Atomic Write: write to temp file, verify, then rename ---
                 # This prevents truncated/corrupt JSON from being visible to consumers.
@@ -810,40 +851,41 @@ def run_invoice_automation(
                     suffix='.json.tmp', dir=str(output_json_path.parent)
                 )
                 try:
-                    with os.fdopen(temp_fd, 'w', encoding='utf-8') as f_json:
-                        f_json.write(json_output_string)
+                    # Already-encoded bytes: no text-layer encoding, and a payload larger than the
+                    # buffer is handed to the OS directly
+                    with os.fdopen(temp_fd, 'wb') as f_json:
+                        f_json.write(json_output_bytes)
                         f_json.flush()
                         os.fsync(f_json.fileno())  # Force write to disk
                     
                     # Post-write integrity check: read back and parse to verify
-                    with open(temp_path, 'r', encoding='utf-8') as f_verify:
-                        json.load(f_verify)  # Will raise JSONDecodeError if truncated/corrupt
+                    loads_output_json(Path(temp_path).read_bytes())  # Will raise JSONDecodeError if truncated/corrupt
                     
                     # Verification passed — atomically replace the target file
                     import shutil
                     shutil.move(temp_path, str(output_json_path))
-                    logging.info(f"Successfully saved JSON output to '{output_json_path}' (verified)")
+                    logging.info("Successfully saved JSON output to '%s' (verified)", output_json_path)
                 except Exception:
                     # Clean up temp file on any failure
                     if os.path.exists(temp_path):
                         os.unlink(temp_path)
                     raise
             except json.JSONDecodeError as verify_err:
-                logging.error(f"CRITICAL: JSON integrity check failed after write — output would be truncated/corrupt: {verify_err}")
+                logging.error("CRITICAL: JSON integrity check failed after write — output would be truncated/corrupt: %s", verify_err)
                 raise RuntimeError(
                     f"JSON output verification failed: the generated data could not be re-parsed. "
                     f"This usually means the data is too large or contains unserializable values. "
                     f"Details: {verify_err}"
                 )
             except IOError as io_err:
-                logging.error(f"Failed to write JSON output to file '{output_json_path}': {io_err}")
+                logging.error("Failed to write JSON output to file '%s': %s", output_json_path, io_err)
                 raise io_err
             except Exception as write_err:
-                 logging.error(f"An unexpected error occurred while writing JSON file: {write_err}", exc_info=True)
+                 logging.error("An unexpected error occurred while writing JSON file: %s", write_err, exc_info=True)
                  raise write_err
 
         except TypeError as json_err:
-            logging.error(f"Failed to serialize data to JSON: {json_err}. Check data types and default handler.", exc_info=True)
+            logging.error("Failed to serialize data to JSON: %s. Check data types and default handler.", json_err, exc_info=True)
             raise json_err
         except Exception as e:
             logging.error(f"An unexpected error occurred during JSON generation: {e}", exc_info=True)
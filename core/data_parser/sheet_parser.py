@@ -242,6 +242,7 @@ def find_and_map_smart_headers(sheet: Worksheet) -> Optional[Tuple[int, Dict[str
 
     best_result: Optional[Tuple[int, Dict[str, str]]] = None
     highest_row_score = 0
+    debug_enabled = logging.getLogger().isEnabledFor(logging.DEBUG)
 
     for row_num in range(HEADER_SEARCH_ROW_RANGE[0], HEADER_SEARCH_ROW_RANGE[1] + 1):
         if row_num + 1 > sheet.max_row:
@@ -250,7 +251,8 @@ def find_and_map_smart_headers(sheet: Worksheet) -> Optional[Tuple[int, Dict[str
         tick("find_and_map_smart_headers", sub="rows_scanned")
         potential_mapping, current_row_score = _process_row(sheet, row_num)
 
-        logging.debug(f"{prefix} Row {row_num} | Score: {current_row_score} | Mapping: {potential_mapping}")
+        if debug_enabled:
+            logging.debug("%s Row %d | Score: %s | Mapping: %s", prefix, row_num, current_row_score, potential_mapping)
 
         if len(potential_mapping) >= 3 and current_row_score > highest_row_score:
             highest_row_score = current_row_score
@@ -1,8 +1,36 @@
 import decimal
 import logging
+from functools import lru_cache
 from typing import Any, Optional
 
 
+@lru_cache(maxsize=8192)
+def _decimal_from_str(value_str: str) -> Optional[decimal.Decimal]:
+    """
+    Cached str -> Decimal parse (Decimals are immutable, so results can be shared).
+    Returns None when the string is not a valid number.
+    """
+    # Trap explicitly so a caller's no-traps context cannot get a NaN cached for bad input
+    with decimal.localcontext() as ctx:
+        ctx.traps[decimal.InvalidOperation] = True
+        try:
+            return decimal.Decimal(value_str)
+        except (decimal.InvalidOperation, TypeError, ValueError):
+            return None
+
+
+@lru_cache(maxsize=8192)
+def _decimal_from_float(value: float) -> Optional[decimal.Decimal]:
+    """
+    Cached float -> Decimal via repr() (the shortest round-tripping string, e.g. 5028.2 -> '5028.2').
+    Returns None for nan/inf. Callers must not pass zeros: 0.0 == -0.0 would share one entry.
+    """
+    value_str = repr(value)
+    if value_str in ('nan', 'inf', '-inf'):
+        return None
+    return decimal.Decimal(value_str)
+
+
 class DataConverter:
     """
     A utility class that groups related data conversion functions.
@@ -58,10 +86,20 @@ class DataConverter:
             Optional[Decimal]: The converted decimal or None if conversion failed/invalid.
         """
         prefix = "[DataConverter.convert_to_decimal]"
-        if isinstance(value, decimal.Decimal):
+        # Exact-type dispatch for the common cell types; subclasses take the general paths below
+        value_type = type(value)
+        if value_type is decimal.Decimal:
             return value
         if value is None:
             return None
+        # Plain ints convert exactly without a str round-trip (bool is excluded on purpose)
+        if value_type is int:
+            return decimal.Decimal(value)
+        # Spreadsheet numbers repeat a lot: parse each distinct non-zero float once
+        if value_type is float and value:
+            return _decimal_from_float(value)
+        if isinstance(value, decimal.Decimal):
+            return value
         
         # Handle floats specially to avoid floating-point precision issues
         # repr() in Python 3.1+ gives the SHORTEST string that round-trips back
@@ -77,11 +115,13 @@ class DataConverter:
                 logging.warning(f"{prefix} Could not convert float '{value}' to Decimal {context}: {e}")
                 return None
         
-        value_str = str(value).strip().replace(',', '')
+        value_str = str(value).strip()
+        # Most cells have no thousands separator: skip the replace() call for them
+        if ',' in value_str:
+            value_str = value_str.replace(',', '')
         if not value_str:
             return None
-        try:
-            return decimal.Decimal(value_str)
-        except (decimal.InvalidOperation, TypeError, ValueError) as e:
-            logging.warning(f"{prefix} Could not convert '{value}' (Str: '{value_str}') to Decimal {context}: {e}")
-            return None
+        result = _decimal_from_str(value_str)
+        if result is None:
+            logging.warning(f"{prefix} Could not convert '{value}' (Str: '{value_str}') to Decimal {context}")
+        return result
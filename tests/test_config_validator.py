@@ -0,0 +1,65 @@
+"""
+Tests for the blueprint ConfigValidator.
+
+- validate(): error reporting for missing sections, meta fields and per-sheet bundles,
+  using the required keys of the (sub)class
+"""
+
+import unittest
+
+from core.blueprint_generator.internal.validator import ConfigValidator
+
+
+def _valid_config():
+    return {
+        "_meta": {"config_version": "1", "customer": "JF", "created_at": "2026-01-01"},
+        "processing": {"sheets": ["Invoice", "Packing list"]},
+        "styling_bundle": {"defaults": {}, "Invoice": {}, "Packing list": {}},
+        "layout_bundle": {
+            "Invoice": {"_sections": ["structure"]},
+            "Packing list": {"_sections": ["structure"]},
+        },
+        "defaults": {},
+    }
+
+
+class TestConfigValidator(unittest.TestCase):
+
+    def setUp(self):
+        self.validator = ConfigValidator()
+
+    def test_valid_config_has_no_errors(self):
+        self.assertEqual(self.validator.validate(_valid_config()), [])
+
+    def test_missing_top_level_and_meta(self):
+        errors = self.validator.validate({})
+        issues = [e["issue"] for e in errors]
+        self.assertIn("Missing Top-Level Section: '_meta'", issues)
+        self.assertIn("Missing Meta Field: '_meta.customer'", issues)
+        self.assertIn("Missing Field: 'processing.sheets'", issues)
+        for error in errors:
+            self.assertEqual(set(error), {"issue", "detail", "fix"})
+
+    def test_missing_sheet_bundles(self):
+        config = _valid_config()
+        del config["styling_bundle"]["Invoice"]
+        del config["layout_bundle"]["Packing list"]
+        config["layout_bundle"]["Invoice"] = {}
+        issues = [e["issue"] for e in self.validator.validate(config)]
+        self.assertEqual(issues, [
+            "Missing Styling for Sheet: 'Invoice'",
+            "Missing Sections Definition in 'Invoice' Layout",
+            "Missing Layout for Sheet: 'Packing list'",
+        ])
+
+    def test_subclass_required_keys_are_used(self):
+        class OnlyKeyValidator(ConfigValidator):
+            REQUIRED_TOP_LEVEL_KEYS = ["only"]
+            REQUIRED_META_KEYS = []
+
+        issues = [e["issue"] for e in OnlyKeyValidator().validate({"processing": {"sheets": []}})]
+        self.assertEqual(issues, ["Missing Top-Level Section: 'only'"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,6 +1,13 @@
+import datetime
+import json
+import os
+import tempfile
 import unittest
 from decimal import Decimal
+import openpyxl
 from core.data_parser import data_processor
+from core.data_parser import main as parser_main
+from core.data_parser.excel_handler import ExcelHandler
 from core.data_parser import sheet_parser
 
 class TestDataParserRefactor(unittest.TestCase):
@@ -59,6 +66,36 @@ class TestDataParserRefactor(unittest.TestCase):
         self.assertEqual(processed[1]['col_amount'], Decimal('30.00'))
         self.assertEqual(processed[2]['col_amount'], Decimal('20.00'))
 
+    def test_distribute_values_float_matches_exact(self):
+        rows = [
+            {"col_qty_pcs": Decimal('3'), "col_net": Decimal('10')},
+            {"col_qty_pcs": None, "col_net": None},
+            {"col_qty_pcs": Decimal('7'), "col_net": None},
+            {"col_qty_pcs": Decimal('1'), "col_net": Decimal('0.0945')},
+            {"col_qty_pcs": Decimal('1'), "col_net": None},
+        ]
+        fast = data_processor.distribute_values([r.copy() for r in rows], ['col_net'], 'col_qty_pcs')
+        exact = data_processor.distribute_values([r.copy() for r in rows], ['col_net'], 'col_qty_pcs', exact_decimal=True)
+        self.assertEqual([r['col_net'] for r in fast], [r['col_net'] for r in exact])
+        self.assertEqual([r['col_net'] for r in fast],
+                         [Decimal('3.0000'), Decimal('0'), Decimal('7.0000'), Decimal('0.0473'), Decimal('0.0472')])
+
+    def test_distribute_values_warns_on_missing_basis(self):
+        rows = [
+            {"col_qty_pcs": 5, "col_net": 10},
+            {"col_qty_pcs": None, "col_net": None},
+            {"col_qty_pcs": 5, "col_net": None},
+        ]
+        for exact_decimal in (False, True):
+            with self.subTest(exact_decimal=exact_decimal):
+                with self.assertLogs('core.data_parser.data_processor', level='WARNING') as logs:
+                    data_processor.distribute_values([r.copy() for r in rows], ['col_net'], 'col_qty_pcs', exact_decimal=exact_decimal)
+                missing = [line for line in logs.output if 'MISSING basis' in line]
+                self.assertEqual(missing, [
+                    "WARNING:core.data_parser.data_processor:[distribute_values] Col 'col_net', "
+                    "Row index 0: Lookahead index 1 has MISSING basis. Will assign 0 later."
+                ])
+
     def test_legacy_standard_aggregation(self):
         global_map = {}
         data = list(self.mock_new_extract[0])
@@ -71,6 +108,103 @@ class TestDataParserRefactor(unittest.TestCase):
         self.assertEqual(res[expected_key]['sqft_sum'], Decimal('201.0'))
         self.assertEqual(res[expected_key]['amount_sum'], Decimal('301.50'))
 
+    def test_invalid_unit_price_warns_on_every_run(self):
+        data = [{"col_po": "A1", "col_item": "I1", "col_unit_price": "1.5USD", "col_qty_sf": 1, "col_amount": 2}]
+        for _ in range(3):
+            with self.assertLogs(level='WARNING') as logs:
+                res = data_processor.aggregate_standard_by_po_item_price([row.copy() for row in data], {})
+            self.assertTrue(any("[aggregate_standard] price" in line for line in logs.output))
+            self.assertIn(("A1", "I1", None, None), res)
+
+    def test_standard_aggregation_keeps_distributed_precision(self):
+        # Distributed values carry 4 places (amounts can carry more); sums must stay exact
+        data = [
+            {"col_po": "A1", "col_item": "I1", "col_unit_price": 1.5, "col_qty_sf": Decimal('0.3333'), "col_amount": Decimal('0.49995')},
+            {"col_po": "A1", "col_item": "I1", "col_unit_price": 1.5, "col_qty_sf": Decimal('0.3333'), "col_amount": Decimal('0.49995')},
+            {"col_po": "A1", "col_item": "I1", "col_unit_price": 1.5, "col_qty_sf": Decimal('0.3334'), "col_amount": Decimal('0.5001')},
+        ]
+        res = data_processor.aggregate_standard_by_po_item_price(data, {})
+        sums = res[("A1", "I1", Decimal('1.5'), None)]
+        self.assertEqual(str(sums['sqft_sum']), '1.0000')
+        self.assertEqual(str(sums['amount_sum']), '1.50000')
+
+    def test_standard_and_custom_aggregation_matches_separate_calls(self):
+        data = [
+            {"col_po": " A1 ", "col_item": "I1", "col_unit_price": 1.5, "col_qty_sf": 10.25, "col_amount": "15.375", "col_desc": "COW"},
+            {"col_po": "A1", "col_item": "I1", "col_unit_price": 2, "col_qty_sf": None, "col_amount": Decimal('4'), "col_net": 3.5},
+            {"col_po": None, "col_item": "I2", "col_unit_price": "1.5", "col_qty_sf": "7", "col_amount": 10.5, "col_cbm_raw": "1*2*3"},
+        ]
+        std_map, custom_map = data_processor.aggregate_standard_and_custom([r.copy() for r in data], {}, {})
+        self.assertEqual(std_map, data_processor.aggregate_standard_by_po_item_price([r.copy() for r in data], {}))
+        self.assertEqual(custom_map, data_processor.aggregate_custom_by_po_item([r.copy() for r in data], {}))
+        self.assertIn(("<MISSING_PO>", "I2", None, None), custom_map)
+
+    def test_summary_totals_stay_exact(self):
+        # Totals must not be rounded to a fixed scale (amounts carry more than 4 places)
+        data = [
+            {"col_qty_pcs": 2, "col_qty_sf": "1,000.12345", "col_net": 0.1, "col_gross": Decimal('0.20001'), "col_amount": Decimal('0.49995'), "col_pallet_count": 1},
+            {"col_qty_pcs": "3", "col_qty_sf": 0.2, "col_net": 0.2, "col_gross": None, "col_amount": Decimal('0.00005'), "col_pallet_count": 0},
+        ]
+        totals = data_processor.calculate_footer_totals(data)
+        self.assertEqual(totals["col_qty_pcs"], 5)
+        self.assertEqual(str(totals["col_qty_sf"]), '1000.32345')
+        self.assertEqual(str(totals["col_net"]), '0.3')
+        self.assertEqual(str(totals["col_amount"]), '0.50000')
+        self.assertEqual(totals["col_pallet_count"], 1)
+        weights = data_processor.calculate_weight_summary(data)
+        self.assertEqual(str(weights["col_net"]), '0.3')
+        self.assertEqual(str(weights["col_gross"]), '0.20001')
+
+    def test_read_only_sheet_matches_full_load(self):
+        wb = openpyxl.Workbook()
+        ws = wb.active
+        ws.title = "Packing list"
+        ws["A1"], ws["B1"], ws["C3"] = "PO#", "ITEM", 299.2
+        ws["B2"] = "I1"
+        ws["A6"].number_format = "0.00"  # formatting only, no value
+        fd, path = tempfile.mkstemp(suffix=".xlsx")
+        os.close(fd)
+        try:
+            wb.save(path)
+            full = ExcelHandler(path).load_sheet()
+            buffered = ExcelHandler(path).load_sheet(read_only=True)
+            self.assertEqual(buffered.title, "Packing list")
+            # Deliberate difference: the formatting-only A6 counts for a full load, not for the buffer
+            self.assertEqual(full.max_row, 6)
+            self.assertEqual(buffered.max_row, 3)
+            for row in range(1, 8):
+                for col in range(1, 5):
+                    self.assertEqual(buffered.cell(row=row, column=col).value, full.cell(row=row, column=col).value)
+            self.assertEqual(buffered["C3"].value, 299.2)
+            self.assertIsNone(buffered["Z99"].value)
+        finally:
+            os.remove(path)
+
+    def test_output_json_round_trip(self):
+        data = {
+            "big": 2 ** 70,  # wider than 64 bits
+            "grouped": {("A1", "I1", Decimal('1.5'), None): {"sqft_sum": Decimal('10.50')}, 3: "int key", None: "none key"},
+            "rows": [{"col_amount": Decimal('0.49995'), "when": datetime.date(2026, 1, 2), "tags": {"x"}}],
+            "name": "牛皮",
+        }
+        raw = parser_main.dumps_output_json(data)
+        self.assertIsInstance(raw, bytes)
+        self.assertTrue(raw.startswith(b'{\n    "big"'))  # 4-space indent
+        self.assertEqual(parser_main.loads_output_json(raw), {
+            "big": 2 ** 70,
+            "grouped": {"('A1', 'I1', Decimal('1.5'), None)": {"sqft_sum": "10.50"}, "3": "int key", "None": "none key"},
+            "rows": [{"col_amount": "0.49995", "when": "2026-01-02", "tags": ["x"]}],
+            "name": "牛皮",
+        })
+        with self.assertRaises(json.JSONDecodeError):
+            parser_main.loads_output_json(raw[:-5])
+
+    def test_daf_compounding_skips_malformed_keys(self):
+        sums = {'sqft_sum': Decimal('1'), 'amount_sum': Decimal('2'), 'net_sum': Decimal('0')}
+        with self.assertLogs(level='WARNING'):
+            result = parser_main.perform_DAF_compounding({5: sums, ("P1", "I1", Decimal('1.5'), "BUFFALO HIDE"): sums}, 'standard')
+        self.assertEqual((result[0]['col_po'], result[0]['col_desc'], result[0]['col_amount']), ("P1", "BUFFALO HIDE", Decimal('2')))
+
     # --- PROSPECTIVE BEHAVIOUR TESTS --- #
     def test_new_cbm(self):
         # Once process_cbm_column is refactored, it should accept a List[Dict] (the table rows)
@@ -0,0 +1,203 @@
+"""
+Tests for the blueprint merge_utils module.
+
+- restore_empty_merges_with_offset / find_and_restore_merges_heuristic:
+  restored merges match worksheet.merge_cells (covered cells, values, borders)
+- find_and_restore_merges_heuristic: the single window scan picks the same cells as
+  rescanning the window for every stored merge
+- MergeOffsetTracker: per-sheet batching, lazy finalize() and agreement with a
+  per-operation reference loop
+"""
+
+import random
+import unittest
+
+import openpyxl
+from openpyxl.cell.cell import MergedCell
+from openpyxl.styles import Border, Side
+
+from core.blueprint_generator.utils.merge_utils import (
+    MergeOffsetTracker,
+    find_and_restore_merges_heuristic,
+    restore_empty_merges_with_offset,
+)
+
+
+def _sheet_state(worksheet):
+    """Merged ranges plus type, value and border of every cell in A1:H30."""
+    cells = {}
+    for row in worksheet.iter_rows(min_row=1, max_row=30, min_col=1, max_col=8):
+        for cell in row:
+            cells[cell.coordinate] = (type(cell).__name__, cell.value, repr(cell.border))
+    return sorted(str(r) for r in worksheet.merged_cells.ranges), cells
+
+
+def _bordered_workbook():
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    ws.title = "Invoice"
+    thin = Side(style="thin")
+    for row in range(10, 16):
+        for col in range(1, 6):
+            ws.cell(row=row, column=col).border = Border(left=thin, right=thin, top=thin, bottom=thin)
+    return wb, ws
+
+
+class TestMergeRestoreMatchesMergeCells(unittest.TestCase):
+
+    def test_empty_merge_restore(self):
+        wb, ws = _bordered_workbook()
+        ws["B12"] = "stale"  # covered by the restored merge, must be cleared
+        expected_wb, expected_ws = _bordered_workbook()
+        expected_ws["B12"] = "stale"
+        expected_ws.merge_cells("A12:C12")
+        expected_ws.row_dimensions[12].height = 30
+
+        empty_merges = {"Invoice": [{'original_row': 12, 'col': 1, 'span': 3, 'height': 30, 'coord': "A12:C12"}]}
+        restore_empty_merges_with_offset(wb, empty_merges, MergeOffsetTracker(), ["Invoice"])
+
+        self.assertEqual(_sheet_state(ws), _sheet_state(expected_ws))
+        self.assertIsInstance(ws["B12"], MergedCell)
+        self.assertEqual(ws.row_dimensions[12].height, 30)
+
+    def test_heuristic_restore(self):
+        wb, ws = _bordered_workbook()
+        ws["B14"], ws["C14"] = "TOTAL", "stale"
+        expected_wb, expected_ws = _bordered_workbook()
+        expected_ws["B14"], expected_ws["C14"] = "TOTAL", "stale"
+        expected_ws.merge_cells("B14:D14")
+        expected_ws.row_dimensions[14].height = 20
+
+        find_and_restore_merges_heuristic(wb, {"Invoice": [(3, "TOTAL", 20)]}, ["Invoice"])
+
+        self.assertEqual(_sheet_state(ws), _sheet_state(expected_ws))
+        self.assertIsNone(ws["C14"].value)
+
+
+def _reference_heuristic(worksheet, stored, search=(1, 10, 8, 30)):
+    """Rescans the window bottom-up for every stored merge, merging as it goes."""
+    min_col, min_row, max_col, max_row = search
+    restored = set()
+    for col_span, stored_value, stored_height in stored:
+        if col_span <= 1 or stored_value is None or stored_value in restored:
+            continue
+        location = next(((r, c) for r in range(max_row, min_row - 1, -1) for c in range(min_col, max_col + 1)
+                         if worksheet.cell(row=r, column=c).value == stored_value), None)
+        if location is None:
+            continue
+        row, col = location
+        for existing in list(worksheet.merged_cells.ranges):
+            if existing.min_row <= row <= existing.max_row and existing.min_col <= col + col_span - 1 and existing.max_col >= col:
+                worksheet.unmerge_cells(existing.coord)
+        worksheet.merge_cells(start_row=row, start_column=col, end_row=row, end_column=col + col_span - 1)
+        if stored_height is not None:
+            worksheet.row_dimensions[row].height = stored_height
+        worksheet.cell(row=row, column=col).value = stored_value
+        restored.add(stored_value)
+
+
+class TestMergeHeuristicScan(unittest.TestCase):
+
+    def _random_sheet(self, rng, values):
+        wb = openpyxl.Workbook()
+        ws = wb.active
+        ws.title = "Invoice"
+        for row in range(10, 31):
+            for col in range(1, 9):
+                if rng.random() < 0.3:
+                    ws.cell(row=row, column=col).value = rng.choice(values)
+        for _ in range(rng.randint(0, 3)):
+            row, col = rng.randint(10, 30), rng.randint(1, 6)
+            ws.merge_cells(start_row=row, start_column=col, end_row=row, end_column=col + rng.randint(1, 2))
+        return wb, ws
+
+    def test_matches_rescanning_reference(self):
+        rng = random.Random(11)
+        values = ["TOTAL", "NW", "GW", 1, 2.5, None]
+        for _ in range(60):
+            seed = rng.random()
+            stored = [(rng.randint(1, 4), rng.choice(values), rng.choice([None, 18.0])) for _ in range(rng.randint(1, 6))]
+            wb, ws = self._random_sheet(random.Random(seed), values)
+            expected_wb, expected_ws = self._random_sheet(random.Random(seed), values)
+
+            find_and_restore_merges_heuristic(wb, {"Invoice": stored}, ["Invoice"], "A10:H30")
+            _reference_heuristic(expected_ws, stored)
+
+            self.assertEqual(_sheet_state(ws), _sheet_state(expected_ws))
+            for row in range(10, 31):
+                self.assertEqual(ws.row_dimensions[row].height, expected_ws.row_dimensions[row].height)
+
+    def test_value_cleared_by_earlier_merge_is_not_reused(self):
+        wb = openpyxl.Workbook()
+        ws = wb.active
+        ws.title = "Invoice"
+        ws["A20"], ws["B20"], ws["C12"] = "TOTAL", "NW", "NW"
+        # Merging TOTAL over A20:B20 clears B20, so NW is restored at its next occurrence
+        find_and_restore_merges_heuristic(wb, {"Invoice": [(2, "TOTAL", None), (2, "NW", None)]}, ["Invoice"])
+        self.assertEqual(sorted(str(r) for r in ws.merged_cells.ranges), ["A20:B20", "C12:D12"])
+        self.assertEqual(ws["C12"].value, "NW")
+
+
+def _reference_position(operations, original_row, sheet_name):
+    """Row shifting applied one logged operation at a time, in log order."""
+    current_row = original_row
+    for op_type, position, count, op_sheet in operations:
+        if op_sheet != sheet_name:
+            continue
+        if op_type == 'delete':
+            delete_end = position + count - 1
+            if current_row < position:
+                pass
+            elif current_row <= delete_end:
+                return -1
+            else:
+                current_row -= count
+        elif current_row >= position:
+            current_row += count
+    return current_row
+
+
+class TestMergeOffsetTracker(unittest.TestCase):
+
+    def test_matches_per_operation_loop(self):
+        rng = random.Random(7)
+        for _ in range(200):
+            tracker = MergeOffsetTracker()
+            operations = []
+            for _ in range(rng.randint(0, 6)):
+                op = (rng.choice(['delete', 'insert']), rng.randint(1, 40), rng.randint(1, 5), rng.choice(['A', 'B']))
+                operations.append(op)
+                if op[0] == 'delete':
+                    tracker.log_delete_rows(op[1], op[2], op[3])
+                else:
+                    tracker.log_insert_rows(op[1], op[2], op[3])
+
+            rows = list(range(1, 50))
+            expected = [_reference_position(operations, row, 'A') for row in rows]
+            self.assertEqual(tracker.calculate_new_positions(rows, 'A').tolist(), expected)
+            self.assertEqual([tracker.calculate_new_position(row, 'A') for row in rows], expected)
+
+    def test_operations_logged_after_finalize_are_applied(self):
+        tracker = MergeOffsetTracker()
+        tracker.log_insert_rows(5, 2, 'A')
+        self.assertTrue(tracker._dirty)
+        self.assertEqual(tracker.calculate_new_position(10, 'A'), 12)
+        self.assertFalse(tracker._dirty)
+
+        # Later operations mark the tracker dirty again and are applied after the earlier ones
+        tracker.log_delete_rows(11, 1, 'A')
+        self.assertTrue(tracker._dirty)
+        self.assertEqual(tracker.calculate_new_position(10, 'A'), 11)
+        self.assertEqual(tracker.calculate_new_position(9, 'A'), -1)
+
+        tracker.log_insert_rows(1, 3, 'B')
+        tracker.finalize()
+        self.assertFalse(tracker._dirty)
+        self.assertEqual(tracker.calculate_new_position(10, 'A'), 11)
+        self.assertEqual(tracker.calculate_new_position(10, 'B'), 13)
+        self.assertEqual(tracker.calculate_new_position(10, 'C'), 10)
+        self.assertEqual(tracker.calculate_new_positions([], 'A').tolist(), [])
+
+
+if __name__ == '__main__':
+    unittest.main()